@@ -94,6 +94,12 @@ class Conf(_config.ConfigNamespace):
         'Format for lines logged to a file.'
     )
 
+    coeff_dtype = _config.ConfigItem(
+        ['float64', 'float32'],
+        'Data type of PSF coefficient cubes stored on instrument objects. \
+        float32 halves memory usage and bandwidth at reduced precision.'
+    )
+
 conf = Conf()
 
 from .logging_utils import setup_logging#, restart_logging
@@ -2,6 +2,9 @@ import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
 
+import functools
+import math
+
 
 import logging
 _log = logging.getLogger('webbpsf_ext')
@@ -17,7 +20,8 @@ si_match = {'NRC': siaf_nrc, 'NIS': siaf_nis, 'MIR': siaf_mir, 'NRS': siaf_nrs,
 
 from .image_manip import get_im_cen
 
-def dist_image(image, pixscale=None, center=None, return_theta=False):
+def dist_image(image, pixscale=None, center=None, return_theta=False, dtype='float',
+               out_rho=None, out_theta=None):
     """Pixel distances
     
     Returns radial distance in units of pixels, unless pixscale is specified.
@@ -40,22 +44,73 @@ def dist_image(image, pixscale=None, center=None, return_theta=False):
         to None, then the default is the array center pixel.
     return_theta : bool
         Also return the angular positions as a 2nd element.
+    dtype : data-type
+        Output data type. Default is float64. Setting to float32 halves 
+        the memory footprint for large images, which is generally 
+        sufficient precision for masking and radial profiles.
+    out_rho : ndarray or None
+        Optional pre-allocated output array for the distances. Must have
+        the same shape as `image`. Useful to reuse buffers across calls.
+    out_theta : ndarray or None
+        Optional pre-allocated output array for the angular positions.
     """
-    y, x = np.indices(image.shape)
+    ny, nx = image.shape
     if center is None:
-        center = tuple((a - 1) / 2.0 for a in image.shape[::-1])
-    x = x - center[0]
-    y = y - center[1]
+        center = ((nx - 1) / 2.0, (ny - 1) / 2.0)
+
+    # Use 1D coordinate vectors and let broadcasting create the 2D outputs
+    # rather than building full index arrays with np.indices
+    x = (np.arange(nx) - center[0]).astype(dtype, copy=False)
+    y = (np.arange(ny) - center[1]).astype(dtype, copy=False)[:, None]
 
-    rho = np.sqrt(x**2 + y**2)
-    if pixscale is not None: 
+    rho = np.hypot(x, y, out=out_rho)
+    if pixscale is not None:
         rho *= pixscale
 
     if return_theta:
-        return rho, np.arctan2(-x,y)*180/np.pi
+        # Negate the 1D x vector before broadcasting and convert in place
+        theta = np.arctan2(-x, y, out=out_theta)
+        np.rad2deg(theta, out=theta)
+        return rho, theta
     else:
         return rho
 
+def annulus_mask(shape, rin=0, rout=None, center=None):
+    """Annular pixel mask
+
+    Returns a boolean mask that is True for pixels with distances 
+    `rin <= r <= rout` from the specified center. Equivalent to
+    thresholding the output of `dist_image`, but compares squared
+    distances directly on broadcast coordinate vectors, so no 
+    intermediate floating point distance image is created.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape (ny,nx) of the output mask.
+    rin : float
+        Inner radius in pixels (inclusive). 
+    rout : float or None
+        Outer radius in pixels (inclusive). If None, then there is
+        no outer boundary.
+    center : tuple
+        Pixel location (x,y) in the array calculate distance. If set 
+        to None, then the default is the array center pixel.
+    """
+    ny, nx = shape
+    if center is None:
+        center = ((nx - 1) / 2.0, (ny - 1) / 2.0)
+
+    x = np.arange(nx) - center[0]
+    y = (np.arange(ny) - center[1])[:, None]
+
+    r2 = x**2 + y**2
+    mask = r2 >= rin**2
+    if rout is not None:
+        mask &= r2 <= rout**2
+
+    return mask
+
 def xy_to_rtheta(x, y):
     """Convert (x,y) to (r,theta)
     
@@ -71,15 +126,24 @@ def xy_to_rtheta(x, y):
     y : float or array
         Y location values
     """
-    r = np.sqrt(x**2 + y**2)
-    theta = np.arctan2(-x,y)*180/np.pi
+    # Scalar inputs are faster with the math module than numpy ufuncs
+    if np.isscalar(x) and np.isscalar(y):
+        r = math.hypot(x, y)
+        theta = math.degrees(math.atan2(-x, y))
+        r = 0.0 if abs(r) < __epsilon else r
+        theta = 0.0 if abs(theta) < __epsilon else theta
+        return r, theta
 
-    if np.size(r)==1:
-        if np.abs(x) < __epsilon: x = 0
-        if np.abs(y) < __epsilon: y = 0
-    else:
-        r[np.abs(r) < __epsilon] = 0
-        theta[np.abs(theta) < __epsilon] = 0
+    x = np.asarray(x)
+    y = np.asarray(y)
+
+    r = np.hypot(x, y)
+    theta = np.rad2deg(np.arctan2(-x, y))
+
+    # Zero out values below machine precision;
+    # [()] returns scalars for 0-d inputs and arrays otherwise
+    r = np.where(np.abs(r) < __epsilon, 0, r)[()]
+    theta = np.where(np.abs(theta) < __epsilon, 0, theta)[()]
 
     return r, theta
 
@@ -98,15 +162,23 @@ def rtheta_to_xy(r, theta):
     theta : float or array
         Position angle for offset in degrees CCW (+Y).
     """
-    x = -r * np.sin(theta*np.pi/180.)
-    y =  r * np.cos(theta*np.pi/180.)
-
-    if np.size(x)==1:
-        if np.abs(x) < __epsilon: x = 0
-        if np.abs(y) < __epsilon: y = 0
-    else:
-        x[np.abs(x) < __epsilon] = 0
-        y[np.abs(y) < __epsilon] = 0
+    # Scalar inputs are faster with the math module than numpy ufuncs
+    if np.isscalar(r) and np.isscalar(theta):
+        theta_rad = math.radians(theta)
+        x = -r * math.sin(theta_rad)
+        y =  r * math.cos(theta_rad)
+        x = 0.0 if abs(x) < __epsilon else x
+        y = 0.0 if abs(y) < __epsilon else y
+        return x, y
+
+    theta_rad = np.deg2rad(theta)
+    x = -r * np.sin(theta_rad)
+    y =  r * np.cos(theta_rad)
+
+    # Zero out values below machine precision;
+    # [()] returns scalars for 0-d inputs and arrays otherwise
+    x = np.where(np.abs(x) < __epsilon, 0, x)[()]
+    y = np.where(np.abs(y) < __epsilon, 0, y)[()]
 
     return x, y
     
@@ -127,8 +199,30 @@ def xy_rot(x, y, ang):
         Rotation angle in degrees CCW
     """
 
-    r, theta = xy_to_rtheta(x, y)    
-    return rtheta_to_xy(r, theta+ang)
+    # Scalar inputs are faster with the math module than numpy ufuncs
+    if np.isscalar(x) and np.isscalar(y) and np.isscalar(ang):
+        ang_rad = math.radians(ang)
+        cos_ang = math.cos(ang_rad)
+        sin_ang = math.sin(ang_rad)
+        xnew = x * cos_ang - y * sin_ang
+        ynew = x * sin_ang + y * cos_ang
+        xnew = 0.0 if abs(xnew) < __epsilon else xnew
+        ynew = 0.0 if abs(ynew) < __epsilon else ynew
+        return xnew, ynew
+
+    # Apply rotation matrix directly rather than converting to (r,theta)
+    ang_rad = np.deg2rad(ang)
+    cos_ang = np.cos(ang_rad)
+    sin_ang = np.sin(ang_rad)
+
+    xnew = x * cos_ang - y * sin_ang
+    ynew = x * sin_ang + y * cos_ang
+
+    # Zero out values below machine precision
+    xnew = np.where(np.abs(xnew) < __epsilon, 0, xnew)[()]
+    ynew = np.where(np.abs(ynew) < __epsilon, 0, ynew)[()]
+
+    return xnew, ynew
 
 
 def oversampled_coords(coords, oversample):
@@ -158,22 +252,58 @@ def oversampled_coords(coords, oversample):
 ###########################################################################
 
 
+@functools.lru_cache
+def _get_NRC_siaf_toc():
+    """NIRCam SIAF copy with table of contents generated
+
+    Copying the SIAF and generating the table of contents is slow, 
+    so only do it once and cache the result.
+    """
+    from copy import deepcopy
+
+    siaf = deepcopy(siaf_nrc)
+    siaf.generate_toc()
+    return siaf
+
+def _NRC_ap_corners_tel(ap):
+    """V2/V3 corners of a NIRCam SIAF aperture (arcsec)"""
+    apname = ap.AperName
+    if ('S_' in apname) or ('ALL_' in apname):
+        v2_ref, v3_ref = ap.corners('tel', False)
+    else:
+        xsci, ysci = ap.corners('sci', False)
+        v2_ref, v3_ref = ap.sci_to_tel(xsci, ysci)
+    return np.asarray(v2_ref, dtype='float'), np.asarray(v3_ref, dtype='float')
+
 # NIRCam aperture limits 
 def get_NRC_v2v3_limits(pupil=None, border=10, return_corners=False, **kwargs):
     """
     V2/V3 Limits for a given module stored within an dictionary
 
+    Results only depend on the input arguments, so they are cached
+    after the first call. Use `clear_v2v3_cache` to reset.
+
     border : float
         Extend a border by some number of arcsec.
     return_corners : bool
         Return the actual aperture corners.
         Otherwise, values are chosen to be a square in V2/V3.
     """
-    
     from copy import deepcopy
 
-    siaf = deepcopy(siaf_nrc)
-    siaf.generate_toc()
+    # Return a copy so that users can't modify the cached values
+    v2v3_limits = _calc_NRC_v2v3_limits(pupil, border, return_corners)
+    return deepcopy(v2v3_limits)
+
+def clear_v2v3_cache():
+    """Clear cached NIRCam V2/V3 limits from `get_NRC_v2v3_limits`"""
+    _calc_NRC_v2v3_limits.cache_clear()
+
+@functools.lru_cache
+def _calc_NRC_v2v3_limits(pupil, border, return_corners):
+    """Cached calculation of NIRCam V2/V3 limits; see `get_NRC_v2v3_limits`"""
+
+    siaf = _get_NRC_siaf_toc()
 
     names_dict = {
         'SW' : 'NRCALL_FULL',
@@ -190,25 +320,18 @@ def get_NRC_v2v3_limits(pupil=None, border=10, return_corners=False, **kwargs):
         apname = names_dict[name]
 
         # Do all four apertures for each SWA & SWB
-        ap = siaf[apname]
-        if ('S_' in apname) or ('ALL_' in apname):
-            v2_ref, v3_ref = ap.corners('tel', False)
-        else:
-            xsci, ysci = ap.corners('sci', False)
-            v2_ref, v3_ref = ap.sci_to_tel(xsci, ysci)
+        v2_ref, v3_ref = _NRC_ap_corners_tel(siaf[apname])
 
         # Offset by 50" if coronagraphy
         if (pupil is not None) and ('LYOT' in pupil):
             v2_ref -= 2.1
             v3_ref += 47.7
 
-        # Add border margin (in arcsec)
-        v2_avg = np.mean(v2_ref)
-        v2_ref[v2_ref<v2_avg] -= border
-        v2_ref[v2_ref>v2_avg] += border
-        v3_avg = np.mean(v3_ref)
-        v3_ref[v3_ref<v3_avg] -= border
-        v3_ref[v3_ref>v3_avg] += border
+        # Add border margin (in arcsec) away from the center
+        v2_mid = 0.5 * (v2_ref.min() + v2_ref.max())
+        v2_ref = v2_ref + border * np.sign(v2_ref - v2_mid)
+        v3_mid = 0.5 * (v3_ref.min() + v3_ref.max())
+        v3_ref = v3_ref + border * np.sign(v3_ref - v3_mid)
 
         # Convert to arcmin
         if return_corners:
@@ -259,6 +382,56 @@ def NIRCam_V2V3_limits(module, channel='LW', pupil=None, rederive=False, return_
     return v2_min, v2_max, v3_min, v3_max
 
 
+@functools.lru_cache(maxsize=256)
+def _ap_refpoint_tel(ap_name):
+    """Cached V2/V3 reference point (arcsec) of a SIAF aperture"""
+    ap_siaf = si_match.get(ap_name[0:3])[ap_name]
+    return ap_siaf.reference_point('tel')
+
+@functools.lru_cache(maxsize=256)
+def _ap_vertices_tel(ap_name):
+    """Cached V2/V3 closed polygon vertices (arcsec) of a SIAF aperture
+    
+    Returned arrays are read-only.
+    """
+    ap_siaf = si_match.get(ap_name[0:3])[ap_name]
+    v2_vert, v3_vert = ap_siaf.closed_polygon_points('tel', rederive=False)
+    v2_vert = np.array(v2_vert, dtype='float')
+    v3_vert = np.array(v3_vert, dtype='float')
+    v2_vert.setflags(write=False)
+    v3_vert.setflags(write=False)
+    return v2_vert, v3_vert
+
+@functools.lru_cache(maxsize=32)
+def _build_attitude(ap_ref, ra_ref, dec_ref, pa, x_off, y_off):
+    """Attitude matrix for a reference aperture offset in 'idl' coords
+
+    Cached since many sets of objects or apertures are typically
+    converted using the same telescope pointing. The returned
+    array is read-only.
+
+    Parameters
+    ----------
+    ap_ref : str
+        Name of reference aperture (e.g., NRCALL_FULL)
+    ra_ref, dec_ref : float
+        Position of reference aperture (RA/Dec deg)
+    pa : float
+        Position angle in degrees measured from North to V3 axis in North to East direction.
+    x_off, y_off : float
+        Total aperture offset in 'idl' coords (arcsec).
+    """
+    ap_siaf_ref = si_match.get(ap_ref[0:3])[ap_ref]
+
+    # V2/V3 reference location aligned with RA/Dec reference
+    # and offset by (x_off, y_off) in 'idl' coords
+    v2_ref, v3_ref = np.array(ap_siaf_ref.convert(x_off, y_off, 'idl', 'tel'))
+
+    # Attitude correction matrix relative to reference aperture
+    att = pysiaf.utils.rotations.attitude(v2_ref, v3_ref, ra_ref, dec_ref, pa)
+    att.setflags(write=False)
+    return att
+
 def ap_radec(ap_obs, ap_ref, coord_ref, pa, base_off=(0,0), dith_off=(0,0),
              get_cenpos=True, get_vert=False):
     """Aperture reference point(s) RA/Dec
@@ -299,11 +472,6 @@ def ap_radec(ap_obs, ap_ref, coord_ref, pa, base_off=(0,0), dith_off=(0,0),
         _log.warning("Neither get_cenpos nor get_vert were set to True. Nothing to return.")
         return
 
-    siaf_obs = si_match.get(ap_obs[0:3])
-    siaf_ref = si_match.get(ap_ref[0:3])
-    ap_siaf_ref = siaf_ref[ap_ref]
-    ap_siaf_obs = siaf_obs[ap_obs]
-
     # RA and Dec of ap ref location and the objects in the field
     ra_ref, dec_ref = coord_ref
 
@@ -311,22 +479,18 @@ def ap_radec(ap_obs, ap_ref, coord_ref, pa, base_off=(0,0), dith_off=(0,0),
     # These appear to be defined in 'idl' coords
     x_off, y_off  = (base_off[0] + dith_off[0], base_off[1] + dith_off[1])
 
-    # V2/V3 reference location aligned with RA/Dec reference
-    # and offset by (x_off, y_off) in 'idl' coords
-    v2_ref, v3_ref = np.array(ap_siaf_ref.convert(x_off, y_off, 'idl', 'tel'))
-
     # Attitude correction matrix relative to reference aperture
-    att = pysiaf.utils.rotations.attitude(v2_ref, v3_ref, ra_ref, dec_ref, pa)
+    att = _build_attitude(ap_ref, ra_ref, dec_ref, pa, x_off, y_off)
 
     # Get V2/V3 position of observed SIAF aperture and convert to RA/Dec
     if get_cenpos==True:
-        v2_obs, v3_obs  = ap_siaf_obs.reference_point('tel')
+        v2_obs, v3_obs  = _ap_refpoint_tel(ap_obs)
         ra_obs, dec_obs = pysiaf.utils.rotations.pointing(att, v2_obs, v3_obs)
         cen_obs = (ra_obs, dec_obs)
     
     # Get V2/V3 vertices of observed SIAF aperture and convert to RA/Dec
     if get_vert==True:
-        v2_vert, v3_vert  = ap_siaf_obs.closed_polygon_points('tel', rederive=False)
+        v2_vert, v3_vert  = _ap_vertices_tel(ap_obs)
         ra_vert, dec_vert = pysiaf.utils.rotations.pointing(att, v2_vert, v3_vert)
         vert_obs = (ra_vert, dec_vert)
 
@@ -341,6 +505,86 @@ def ap_radec(ap_obs, ap_ref, coord_ref, pa, base_off=(0,0), dith_off=(0,0),
         return
 
 
+def ap_radec_many(ap_obs_list, ap_ref, coord_ref, pa, base_off=(0,0), dith_off=(0,0),
+                  get_cenpos=True, get_vert=False):
+    """Aperture reference point(s) RA/Dec for multiple apertures
+
+    Same as `ap_radec`, but for a list of observed apertures sharing the
+    same reference aperture and pointing. The attitude matrix is only
+    calculated once and all V2/V3 positions are converted to RA/Dec
+    in a single call.
+
+    Parameters
+    ----------
+    ap_obs_list : list of str
+        Names of observed apertures (e.g., ['NRCA1_FULL', 'NRCA5_FULL'])
+    ap_ref : str
+        Name of reference aperture (e.g., NRCALL_FULL)
+    coord_ref : tuple or list
+        Center position of reference aperture (RA/Dec deg)
+    pa : float
+        Position angle in degrees measured from North to V3 axis in North to East direction.
+
+    Keyword Args
+    ------------
+    base_off : list or tuple
+        X/Y offset of overall aperture offset (see APT pointing file)
+    dither_off : list or tuple
+        Additional offset from dithering (see APT pointing file)
+    get_cenpos : bool
+        Return aperture reference location coordinates?
+    get_vert: bool
+        Return closed polygon vertices (useful for plotting)?
+
+    Returns
+    -------
+    If `get_cenpos`, a tuple of (RA, Dec) arrays with one element per
+    observed aperture. If `get_vert`, a list of (RA, Dec) vertex arrays
+    for each aperture. If both are set, returns (cen_obs, vert_obs).
+    """
+
+    if (get_cenpos==False) and (get_vert==False):
+        _log.warning("Neither get_cenpos nor get_vert were set to True. Nothing to return.")
+        return
+
+    # RA and Dec of ap ref location
+    ra_ref, dec_ref = coord_ref
+
+    # Field offset as specified in APT Special Requirements
+    x_off, y_off  = (base_off[0] + dith_off[0], base_off[1] + dith_off[1])
+
+    # Attitude correction matrix relative to reference aperture
+    att = _build_attitude(ap_ref, ra_ref, dec_ref, pa, x_off, y_off)
+
+    # Reference points of all observed apertures in a single conversion
+    if get_cenpos==True:
+        v2v3_obs = np.array([_ap_refpoint_tel(ap) for ap in ap_obs_list])
+        v2_obs, v3_obs = v2v3_obs.T
+        cen_obs = pysiaf.utils.rotations.pointing(att, v2_obs, v3_obs)
+
+    # Place all vertices in a single V2/V3 buffer and convert together,
+    # then return slices for each aperture
+    if get_vert==True:
+        vert_list = [_ap_vertices_tel(ap) for ap in ap_obs_list]
+        nvert = np.array([len(v2) for v2, _ in vert_list])
+        ind_edges = np.concatenate([[0], np.cumsum(nvert)])
+
+        v2v3_vert = np.empty((2, ind_edges[-1]))
+        for i, (v2, v3) in enumerate(vert_list):
+            v2v3_vert[0, ind_edges[i]:ind_edges[i+1]] = v2
+            v2v3_vert[1, ind_edges[i]:ind_edges[i+1]] = v3
+        ra_vert, dec_vert = pysiaf.utils.rotations.pointing(att, v2v3_vert[0], v2v3_vert[1])
+
+        vert_obs = [(ra_vert[i0:i1], dec_vert[i0:i1]) for i0, i1 in zip(ind_edges[:-1], ind_edges[1:])]
+
+    if (get_cenpos==True) and (get_vert==True):
+        return cen_obs, vert_obs
+    elif get_cenpos==True:
+        return cen_obs
+    else:
+        return vert_obs
+
+
 def convert_to_sky(coords, siaf_obs_name, radec_ref, pa_v3, frame_in='sci'):
     """ Convert coordinates to RA/Dec
     
@@ -486,12 +730,8 @@ def radec_to_v2v3(coord_objs, siaf_ref_name, coord_ref, pa_ref,
     # These appear to be defined in 'idl' coords
     x_off, y_off  = (base_off[0] + dith_off[0], base_off[1] + dith_off[1])
 
-    # V2/V3 reference location aligned with RA/Dec reference
-    # and offset by (x_off, y_off) in 'idl' coords
-    v2_ref, v3_ref = np.array(siaf_ap.convert(x_off, y_off, 'idl', 'tel'))
-
     # Attitude correction matrix relative to reference aperture
-    att = pysiaf.utils.rotations.attitude(v2_ref, v3_ref, ra_ref, dec_ref, pa_ref)
+    att = _build_attitude(siaf_ref_name, ra_ref, dec_ref, pa_ref, x_off, y_off)
 
     # Convert all RA/Dec coordinates into V2/V3 positions for objects
     v2_obj, v3_obj = pysiaf.utils.rotations.getv2v3(att, ra_obj, dec_obj)
@@ -537,6 +777,34 @@ def v2v3_to_pixel(ap_obs, v2_obj, v3_obj, frame='sci'):
     return (xpix, ypix)
 
 
+# Nominal SGD pattern offsets (mas), including central position
+_sgd_offsets_msec = {
+    '9circle' : (np.array([0.0,  0,-15,-20,-15,  0,+15,+20,+15]),
+                 np.array([0.0,+20,+15,  0,-15,-20,-15,  0,+15])),
+    '5box'    : (np.array([0.0,+15,-15,-15,+15]),
+                 np.array([0.0,+15,+15,-15,-15])),
+    '5diamond': (np.array([0.0,  0,  0,+20,-20]),
+                 np.array([0.0,+20,-20,  0,  0])),
+    '5bar'    : (np.array([0.0,  0,  0,  0,  0]),
+                 np.array([0.0,+20,+10,-10,-20])),
+    '3bar'    : (np.array([0.0,  0,  0]),
+                 np.array([0.0,+15,-15])),
+    '5miri'   : (np.array([0.0,-10,+10,+10,-10]),
+                 np.array([0.0,+10,+10,-10,-10])),
+    '9miri'   : (np.array([0.0,-10,-10,  0,+10,+10,+10,  0,-10]),
+                 np.array([0.0,  0,+10,+10,+10,  0,-10,-10,-10])),
+}
+# APT names for SGD patterns
+_sgd_apt_names = {
+    '9-POINT-CIRCLE'     : '9circle',
+    '5-POINT-BOX'        : '5box',
+    '5-POINT-DIAMOND'    : '5diamond',
+    '5-POINT-BAR'        : '5bar',
+    '3-POINT-BAR'        : '3bar',
+    '5-POINT-SMALL-GRID' : '5miri',
+    '9-POINT-SMALL-GRID' : '9miri',
+}
+
 def get_sgd_offsets(sgd_type):
     """ Get SGD offsets
 
@@ -556,34 +824,16 @@ def get_sgd_offsets(sgd_type):
         '5-POINT-BAR', '5-POINT-SMALL-GRID', '9-POINT-SMALL-GRID'.
     """
 
-    if sgd_type.lower()=='9circle' or sgd_type.upper()=='9-POINT-CIRCLE':
-        xoff_msec = np.array([0.0,  0,-15,-20,-15,  0,+15,+20,+15])
-        yoff_msec = np.array([0.0,+20,+15,  0,-15,-20,-15,  0,+15])
-    elif sgd_type.lower()=='5box' or sgd_type.upper()=='5-POINT-BOX':
-        xoff_msec = np.array([0.0,+15,-15,-15,+15])
-        yoff_msec = np.array([0.0,+15,+15,-15,-15])
-    elif sgd_type.lower()=='5diamond' or sgd_type.upper()=='5-POINT-DIAMOND':
-        xoff_msec = np.array([0.0,  0,  0,+20,-20])
-        yoff_msec = np.array([0.0,+20,-20,  0,  0])
-    elif sgd_type.lower()=='5bar' or sgd_type.upper()=='5-POINT-BAR':
-        xoff_msec = np.array([0.0,  0,  0,  0,  0])
-        yoff_msec = np.array([0.0,+20,+10,-10,-20])
-    elif sgd_type.lower()=='3bar' or sgd_type.upper()=='3-POINT-BAR':
-        xoff_msec = np.array([0.0,  0,  0])
-        yoff_msec = np.array([0.0,+15,-15])
-    elif sgd_type.lower()=='5miri' or sgd_type.upper()=='5-POINT-SMALL-GRID':
-        xoff_msec = np.array([0.0,-10,+10,+10,-10])
-        yoff_msec = np.array([0.0,+10,+10,-10,-10])
-    elif sgd_type.lower()=='9miri' or sgd_type.upper()=='9-POINT-SMALL-GRID':
-        xoff_msec = np.array([0.0,-10,-10,  0,+10,+10,+10,  0,-10])
-        yoff_msec = np.array([0.0,  0,+10,+10,+10,  0,-10,-10,-10])
-    else:
+    sgd_name = _sgd_apt_names.get(sgd_type.upper(), sgd_type.lower())
+    try:
+        xoff_msec, yoff_msec = _sgd_offsets_msec[sgd_name]
+    except KeyError:
         raise ValueError(f"{sgd_type} not a valid SGD type")
     
-    # Return in arcsec
+    # Return in arcsec (division returns new arrays)
     return xoff_msec / 1000, yoff_msec / 1000
 
-def gen_sgd_offsets(sgd_type, slew_std=5, fsm_std=2.5, rand_seed=None):
+def gen_sgd_offsets(sgd_type, slew_std=5, fsm_std=2.5, rand_seed=None, n_realizations=1):
     """ Generate SGD offsets with random point errors
 
     Create a series of x and y position offsets for a SGD pattern.
@@ -613,25 +863,36 @@ def gen_sgd_offsets(sgd_type, slew_std=5, fsm_std=2.5, rand_seed=None):
     rand_seed : int
         Input a random seed in order to make reproduceable pseudo-random
         numbers.
+    n_realizations : int
+        Number of independent random realizations of the SGD pattern.
+        If greater than 1, the returned x and y offsets are arrays of 
+        shape (n_realizations, npos); otherwise they are 1D arrays.
     """
     # Get SGD offsets in mas    
     xoff_msec, yoff_msec = np.array(get_sgd_offsets(sgd_type)) * 1000
 
+    # Replicate nominal pattern for each realization
+    nsgd = xoff_msec.size
+    xoff_msec = np.tile(xoff_msec, (n_realizations, 1))
+    yoff_msec = np.tile(yoff_msec, (n_realizations, 1))
+
     # Create local random number generator to avoid global seed setting
     rng = np.random.default_rng(seed=rand_seed)
 
     # Add randomized telescope offsets
     if slew_std>0:
-        x_point, y_point = rng.normal(scale=slew_std, size=2)
+        x_point, y_point = rng.normal(scale=slew_std, size=(2, n_realizations, 1))
         xoff_msec += x_point
         yoff_msec += y_point
 
     # Add randomized FSM offsets
     if fsm_std>0:
-        x_fsm = rng.normal(scale=fsm_std, size=xoff_msec.shape)
-        y_fsm = rng.normal(scale=fsm_std, size=yoff_msec.shape)
-        xoff_msec[1:] += x_fsm[1:]
-        yoff_msec[1:] += y_fsm[1:]
+        x_fsm, y_fsm = rng.normal(scale=fsm_std, size=(2, n_realizations, nsgd))
+        xoff_msec[:,1:] += x_fsm[:,1:]
+        yoff_msec[:,1:] += y_fsm[:,1:]
+
+    if n_realizations==1:
+        xoff_msec, yoff_msec = (xoff_msec[0], yoff_msec[0])
     
     return xoff_msec / 1000, yoff_msec / 1000
 
@@ -676,9 +937,9 @@ def get_idl_offset(base_offset=(0,0), dith_offset=(0,0), base_std=0, use_ta=True
     # Create local random number generator to avoid global seed setting
     rng = np.random.default_rng(seed=rand_seed)
 
-    # Convert to arrays (values of mas)
-    base_xy = np.asarray(base_offset, dtype='float') * 1000
-    dith_xy = np.asarray(dith_offset, dtype='float') * 1000
+    # Total nominal offset (values of mas)
+    xoff = (float(base_offset[0]) + float(dith_offset[0])) * 1000
+    yoff = (float(base_offset[1]) + float(dith_offset[1])) * 1000
 
     # Set telescope slew uncertainty
     if base_std is None:
@@ -688,11 +949,12 @@ def get_idl_offset(base_offset=(0,0), dith_offset=(0,0), base_std=0, use_ta=True
     if (dith_std is None):
         dith_std = 2.5 if use_sgd else 5.0
     
-    base_rand = rng.normal(loc=base_xy, scale=base_std)
-    dith_rand = rng.normal(loc=dith_xy, scale=dith_std)
-    # Add and convert to arcsec
-    offset = (base_rand + dith_rand) / 1000
-    return offset
+    # Draw slew then dither errors so seeded offsets are reproducible
+    offset_rand = rng.normal(loc=(xoff, yoff), scale=base_std)
+    offset_rand += rng.normal(scale=dith_std, size=2)
+    # Convert to arcsec
+    offset_rand /= 1000
+    return offset_rand
 
 def radec_offset(ra, dec, dist, pos_ang):
     """
@@ -3,10 +3,13 @@ from astropy.io.fits import hdu
 import numpy as np
 import multiprocessing as mp
 import six
+import os, functools, hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 import scipy
-from scipy import fftpack
-from scipy.ndimage import fourier_shift, rotate
+import scipy.fft
+from scipy.ndimage import rotate, affine_transform
+from scipy.spatial import cKDTree
 
 try:
     import cv2
@@ -31,6 +34,29 @@ _log = logging.getLogger('webbpsf_ext')
 #    Image manipulation
 ###########################################################################
 
+@functools.lru_cache
+def _get_thread_pool():
+    """Shared thread pool for independent per-image operations
+
+    Most of the work in per-image shifts and rotations happens in
+    numpy/scipy routines that release the GIL, so threads scale well.
+    """
+    return ThreadPoolExecutor(max_workers=os.cpu_count())
+
+def _map_images(func, images, out):
+    """Apply `func` to each image in a stack and store results in `out`"""
+
+    def _run(i):
+        out[i] = func(images[i])
+
+    nz = len(images)
+    if nz==1:
+        _run(0)
+    else:
+        # Consume iterator to raise any exceptions
+        list(_get_thread_pool().map(_run, range(nz)))
+    return out
+
 def get_im_cen(im):
     """
     Returns pixel position (xcen, ycen) of array center.
@@ -73,6 +99,10 @@ def fshift(inarr, delx=0, dely=0, pad=False, cval=0.0, interp='linear', **kwargs
     ndarray
         Shifted image
     """
+
+    # Return a copy if both delx and dely are 0, as callers may modify the output
+    if np.isclose(delx, 0, atol=1e-5) and np.isclose(dely, 0, atol=1e-5):
+        return inarr.copy()
     
     from scipy.interpolate import interp1d, interp2d
 
@@ -97,14 +127,17 @@ def fshift(inarr, delx=0, dely=0, pad=False, cval=0.0, interp='linear', **kwargs
             out = np.pad(inarr,np.abs(intx),'constant',constant_values=cval)
         else:
             padx = 0
-            out = inarr.copy()
+            out = inarr
 
         # shift by integer portion
         out = np.roll(out, intx)
         # if significant fractional shift...
         if not np.isclose(fracx, 0, atol=1e-5):
             if interp=='linear':
-                out = out * (1.-fracx) + np.roll(out,1) * fracx
+                # Cast weight to image dtype so float32 arrays are not promoted
+                if np.issubdtype(out.dtype, np.floating):
+                    fracx = out.dtype.type(fracx)
+                out = out * (1-fracx) + np.roll(out,1) * fracx
             elif interp=='cubic':
                 xvals = np.arange(len(out))
                 fint = interp1d(xvals, out, kind=interp, bounds_error=False, fill_value='extrapolate')
@@ -118,9 +151,9 @@ def fshift(inarr, delx=0, dely=0, pad=False, cval=0.0, interp='linear', **kwargs
 
         out = out[padx:padx+inarr.size]
     elif ndim == 2:	
-        # Return if both delx and dely are 0
-        if np.isclose(delx, 0, atol=1e-5) and np.isclose(dely, 0, atol=1e-5):
-            return inarr
+        # Bilinear shift accumulated in a single output array
+        if interp=='linear':
+            return _fshift_stack(inarr[np.newaxis], delx, dely, pad=pad, cval=cval)[0]
 
         ny, nx = shape
 
@@ -136,36 +169,32 @@ def fshift(inarr, delx=0, dely=0, pad=False, cval=0.0, interp='linear', **kwargs
             fracy += 1
             inty -= 1
 
-        # Pad ends with constant value
-        if pad:
-            padx = np.abs(intx) + 5
-            pady = np.abs(inty) + 5
-            pad_vals = ([pady]*2,[padx]*2)
-            out = np.pad(inarr,pad_vals,'constant',constant_values=cval)
-        else:
-            padx = 0; pady = 0
-            out = inarr.copy()
-
-        # shift by integer portion
-        out = np.roll(out, (inty, intx), axis=(0,1))
-    
         # Check if fracx and fracy are effectively 0
         fxis0 = np.isclose(fracx,0, atol=1e-5)
         fyis0 = np.isclose(fracy,0, atol=1e-5)
+
+        if pad and fxis0 and fyis0 and np.isscalar(cval):
+            # Whole pixel shift with vacated pixels set to cval
+            padx = 0; pady = 0
+            out = _int_shift(inarr, intx, inty, cval=cval)
+        else:
+            # Pad ends with constant value
+            if pad:
+                padx = np.abs(intx) + 5
+                pady = np.abs(inty) + 5
+                pad_vals = ([pady]*2,[padx]*2)
+                out = np.pad(inarr,pad_vals,'constant',constant_values=cval)
+            else:
+                padx = 0; pady = 0
+                out = inarr
+
+            # shift by integer portion (np.roll returns a new array)
+            out = np.roll(out, (inty, intx), axis=(0,1))
         
         if fxis0 and fyis0:
             # If fractional shifts are 0, no need for interpolation
             # Just perform whole pixel shifts
             pass
-        elif interp=='linear':
-            # Break bi-linear interpolation into four parts
-            # to avoid NaNs unnecessarily affecting integer shifted dimensions
-            part1 = out * ((1-fracx)*(1-fracy))
-            part2 = 0 if fyis0 else np.roll(out,1,axis=0)*((1-fracx)*fracy)
-            part3 = 0 if fxis0 else np.roll(out,1,axis=1)*((1-fracy)*fracx)
-            part4 = 0 if (fxis0 or fyis0) else np.roll(np.roll(out, 1, axis=1), 1, axis=0) * fracx*fracy
-
-            out = part1 + part2 + part3 + part4
         elif interp=='cubic' or interp=='quintic':
             fracx = 0 if fxis0 else fracx
             fracy = 0 if fxis0 else fracy
@@ -179,6 +208,10 @@ def fshift(inarr, delx=0, dely=0, pad=False, cval=0.0, interp='linear', **kwargs
     
         out = out[pady:pady+ny, padx:padx+nx]
     elif ndim == 3:
+        # Bilinear shift of the full stack at once
+        if interp=='linear':
+            return _fshift_stack(inarr, delx, dely, pad=pad, cval=cval)
+
         # Perform shift on each image in succession
         kwargs['delx'] = delx
         kwargs['dely'] = dely
@@ -198,7 +231,130 @@ def fshift(inarr, delx=0, dely=0, pad=False, cval=0.0, interp='linear', **kwargs
 
     return out
 
-                          
+def _int_shift(arr, intx, inty, cval=0.0):
+    """Shift the last two axes of `arr` by whole pixels
+
+    Pixels shifted in from outside the array are set to `cval`.
+    Equivalent to a padded `np.roll` followed by cropping.
+    """
+
+    ny, nx = arr.shape[-2:]
+    # Assign cval (rather than `np.full_like`) so that it is cast the same
+    # as `np.pad`, which raises for NaN or inf in integer arrays
+    out = np.empty_like(arr)
+    out[...] = cval
+    if (abs(intx) >= nx) or (abs(inty) >= ny):
+        return out
+
+    ys_dst = slice(max(inty,0), ny+min(inty,0))
+    xs_dst = slice(max(intx,0), nx+min(intx,0))
+    ys_src = slice(max(-inty,0), ny+min(-inty,0))
+    xs_src = slice(max(-intx,0), nx+min(-intx,0))
+    out[..., ys_dst, xs_dst] = arr[..., ys_src, xs_src]
+    return out
+
+def _fshift_stack(arr3d, delx=0, dely=0, pad=False, cval=0.0):
+    """Bilinear fractional shift of an image cube [nz,ny,nx]
+
+    Same behavior as `fshift` with `interp='linear'` applied to each
+    image, but operating on the whole stack at once.
+    """
+
+    nz, ny, nx = arr3d.shape
+
+    # Return a copy if both delx and dely are 0
+    if np.isclose(delx, 0, atol=1e-5) and np.isclose(dely, 0, atol=1e-5):
+        return arr3d.copy()
+
+    # separate shift into an integer and fraction shift
+    intx = int(delx)
+    inty = int(dely)
+    fracx = delx - intx
+    fracy = dely - inty
+    if fracx < 0:
+        fracx += 1
+        intx -= 1
+    if fracy < 0:
+        fracy += 1
+        inty -= 1
+
+    # Check if fracx and fracy are effectively 0
+    fxis0 = np.isclose(fracx,0, atol=1e-5)
+    fyis0 = np.isclose(fracy,0, atol=1e-5)
+
+    padx = pady = 0
+    if pad and np.isscalar(cval):
+        if fxis0 and fyis0:
+            # Whole pixel shift with vacated pixels set to cval
+            out = _int_shift(arr3d, intx, inty, cval=cval)
+        else:
+            # Equivalent to padding with constant value then rolling
+            padx = np.abs(intx) + 5
+            pady = np.abs(inty) + 5
+            # Assign cval so it is cast the same as `np.pad`
+            out = np.empty((nz, ny+2*pady, nx+2*padx), dtype=arr3d.dtype)
+            out[...] = cval
+            out[:, pady+inty:pady+inty+ny, padx+intx:padx+intx+nx] = arr3d
+    elif pad:
+        # Pad ends with constant value
+        padx = np.abs(intx) + 5
+        pady = np.abs(inty) + 5
+        pad_vals = ((0,0),(pady,pady),(padx,padx))
+        out = np.pad(arr3d,pad_vals,'constant',constant_values=cval)
+        out = np.roll(out, (inty, intx), axis=(1,2))
+    else:
+        # shift by integer portion, wrapping around edges
+        out = np.roll(arr3d, (inty, intx), axis=(1,2))
+
+    if not (fxis0 and fyis0):
+        # Cast weights to image dtype so float32 images are not promoted
+        if np.issubdtype(out.dtype, np.floating):
+            fracx = out.dtype.type(fracx)
+            fracy = out.dtype.type(fracy)
+
+        # Accumulate bi-linear terms into a single output array.
+        # Shifts by one pixel (with wrap) are built from slice views, and
+        # terms with zero fractional shift are skipped to avoid NaNs 
+        # unnecessarily affecting integer shifted dimensions.
+        res = out * ((1-fracx)*(1-fracy))
+        if not fyis0:
+            wy = (1-fracx)*fracy
+            res[:,1:,:] += out[:,:-1,:] * wy
+            res[:,0,:]  += out[:,-1,:] * wy
+        if not fxis0:
+            wx = (1-fracy)*fracx
+            res[:,:,1:] += out[:,:,:-1] * wx
+            res[:,:,0]  += out[:,:,-1] * wx
+        if not (fxis0 or fyis0):
+            outy = np.roll(out, 1, axis=1)
+            wxy = fracx*fracy
+            res[:,:,1:] += outy[:,:,:-1] * wxy
+            res[:,:,0]  += outy[:,:,-1] * wxy
+        out = res
+
+    out = out[:, pady:pady+ny, padx:padx+nx]
+
+    # Ensure the output isn't all NaNs
+    if np.isnan(out).all():
+        # Report number of NaNs in input and raise error 
+        n_nan = np.sum(np.isnan(arr3d))
+        raise ValueError(f'fshift: All NaNs in final shifted array. Found {n_nan} NaNs in input.')
+
+    return out
+
+@functools.lru_cache(maxsize=32)
+def _fft_freqs(shape):
+    """Sample frequencies (ky, kx) of a 2D FFT with the given (ny, nx) shape
+
+    Arrays are broadcastable against the FFT and read-only since they are cached.
+    """
+    ny, nx = shape
+    ky = scipy.fft.fftfreq(ny).reshape([-1,1])
+    kx = scipy.fft.fftfreq(nx).reshape([1,-1])
+    ky.setflags(write=False)
+    kx.setflags(write=False)
+    return ky, kx
+
 def fourier_imshift(image, xshift, yshift, pad=False, cval=0.0, 
                     window_func=None, **kwargs):
     """Fourier shift image
@@ -260,13 +416,14 @@ def fourier_imshift(image, xshift, yshift, pad=False, cval=0.0,
             padx = 0; pady = 0
             im = image
         
-        im_fft = np.fft.fft2(im)
+        im_fft = scipy.fft.fft2(im, workers=-1)
         if window_func is not None:
             im_otf = np.fft.fftshift(im_fft)
             im_otf *= winfunc(window_func, im_otf.shape)
             im_fft = np.fft.ifftshift(im_otf)
-        offset = fourier_shift(im_fft, (yshift,xshift))
-        offset = np.fft.ifft2(offset).real
+        ky, kx = _fft_freqs(im_fft.shape)
+        im_fft *= np.exp(-2j * np.pi * (ky*yshift + kx*xshift))
+        offset = scipy.fft.ifft2(im_fft, workers=-1).real
         
         offset = offset[pady:pady+ny, padx:padx+nx]
 
@@ -277,13 +434,84 @@ def fourier_imshift(image, xshift, yshift, pad=False, cval=0.0,
             raise ValueError(f'fourier_imshift: All NaNs in final shifted image. Found {n_nan} NaNs in input.')
         
     elif ndim==3:
-        kwargs['pad'] = pad
-        kwargs['cval'] = cval
-        offset = np.array([fourier_imshift(im, xshift, yshift, **kwargs) for im in image])
+        offset = fourier_imshift_stack(image, xshift, yshift, pad=pad, cval=cval, 
+                                       window_func=window_func)
     else:
         raise ValueError(f'fourier_imshift: Found {ndim} dimensions {shape}. Only up 2 or 3 dimensions allowed.')
     
     return offset
+
+def fourier_imshift_stack(images, xshifts, yshifts, pad=False, cval=0.0, 
+                          window_func=None):
+    """Fourier shift an image cube
+
+    Batched version of `fourier_imshift` for an image cube [nz,ny,nx].
+    Forward and inverse FFTs are performed on the whole stack at once,
+    and the phase ramp is built from frequency grids computed a single time.
+
+    Parameters
+    ----------
+    images : ndarray
+        3D image cube [nz,ny,nx].
+    xshifts : float or array-like
+        Number of pixels to shift each image in the x direction.
+        Either a single value or one value per image.
+    yshifts : float or array-like
+        Number of pixels to shift each image in the y direction.
+        Either a single value or one value per image.
+    pad : bool
+        Should we pad the array before shifting, then truncate?
+        Otherwise, the image is wrapped. Pad size is set by the
+        largest shift in the stack.
+    cval : sequence or float, optional
+        The values to set the padded values for each axis. Default is 0.
+    window_func : string, float, or tuple
+        Name of window function from `scipy.signal.windows` to use before 
+        Fourier shifting. See `fourier_imshift` for details.
+
+    Returns
+    -------
+    ndarray
+        Shifted image cube
+    """
+
+    from skimage.filters import window as winfunc
+
+    nz, ny, nx = images.shape
+    xshifts = np.broadcast_to(np.asarray(xshifts, dtype='float'), (nz,))
+    yshifts = np.broadcast_to(np.asarray(yshifts, dtype='float'), (nz,))
+
+    # Pad ends with constant value
+    if pad:
+        padx = int(np.abs(xshifts.astype('int')).max()) + 5
+        pady = int(np.abs(yshifts.astype('int')).max()) + 5
+        pad_vals = ((0,0),(pady,pady),(padx,padx))
+        ims = np.pad(images,pad_vals,'constant',constant_values=cval)
+    else:
+        padx = 0; pady = 0
+        ims = images
+
+    im_fft = scipy.fft.fft2(ims, axes=(-2,-1), workers=-1)
+    if window_func is not None:
+        im_otf = np.fft.fftshift(im_fft, axes=(-2,-1))
+        im_otf *= winfunc(window_func, im_otf.shape[-2:])
+        im_fft = np.fft.ifftshift(im_otf, axes=(-2,-1))
+
+    # Phase ramp for each image
+    ky, kx = _fft_freqs(ims.shape[-2:])
+    phase = kx * xshifts[:,None,None] + ky * yshifts[:,None,None]
+    im_fft *= np.exp(-2j * np.pi * phase)
+
+    offset = scipy.fft.ifft2(im_fft, axes=(-2,-1), workers=-1).real
+    offset = offset[:, pady:pady+ny, padx:padx+nx]
+
+    # Ensure the output isn't all NaNs
+    if np.isnan(offset).all():
+        # Report number of NaNs in input and raise error 
+        n_nan = np.sum(np.isnan(images))
+        raise ValueError(f'fourier_imshift: All NaNs in final shifted image. Found {n_nan} NaNs in input.')
+
+    return offset
     
 def cv_shift(image, xshift, yshift, pad=False, cval=0.0, interp='lanczos', **kwargs):
     """Use OpenCV library for image shifting
@@ -839,6 +1067,18 @@ def image_shift_with_nans(image, xshift, yshift, shift_method='fourier', interp=
 #    Image Cropping
 ###########################################################################
 
+def _pad_crop_edges(n_in, n_out):
+    """Slices mapping a centered region between axes of size `n_in` and `n_out`
+
+    Returns `(src, dst)` slices such that `out[dst] = arr[src]` pads or 
+    crops symmetrically. Odd differences place the extra pixel before the data.
+    """
+    lo = (abs(n_out - n_in) + 1) // 2
+    if n_out >= n_in:
+        return slice(0, n_in), slice(lo, lo+n_in)
+    else:
+        return slice(lo, lo+n_out), slice(0, n_out)
+
 def pad_or_cut_to_size(array, new_shape, fill_val=0.0, offset_vals=None,
     shift_func=fshift, **kwargs):
     """
@@ -879,7 +1119,7 @@ def pad_or_cut_to_size(array, new_shape, fill_val=0.0, offset_vals=None,
         # Reshape array to a 2D array with nx=1
         array = array.reshape((1,1,-1))
         nz, ny, nx = array.shape
-        if isinstance(new_shape, (float,int,np.int64)):
+        if isinstance(new_shape, (int, float, np.integer)):
             nx_new = int(new_shape+0.5)
             ny_new = 1
         elif len(new_shape) < 2:
@@ -888,7 +1128,6 @@ def pad_or_cut_to_size(array, new_shape, fill_val=0.0, offset_vals=None,
         else:
             ny_new, nx_new = new_shape
         new_shape = (ny_new, nx_new)
-        output = np.zeros(shape=(nz,ny_new,nx_new), dtype=array.dtype)
     elif (ndim == 2) or (ndim == 3):
         if ndim==2:
             nz = 1
@@ -897,36 +1136,34 @@ def pad_or_cut_to_size(array, new_shape, fill_val=0.0, offset_vals=None,
         else:
             nz, ny, nx = array.shape
 
-        if isinstance(new_shape, (float,int,np.int64)):
+        if isinstance(new_shape, (int, float, np.integer)):
             ny_new = nx_new = int(new_shape+0.5)
         elif len(new_shape) < 2:
             ny_new = nx_new = new_shape[0]
         else:
             ny_new, nx_new = new_shape
         new_shape = (ny_new, nx_new)
-        output = np.zeros(shape=(nz,ny_new,nx_new), dtype=array.dtype)
     else:
         raise ValueError(f'Found {ndim} dimensions (shape={shape_orig}). Only up to 3 dimensions allowed.')
                       
     # Return if no difference in shapes
     # This needs to occur after the above so that new_shape is verified to be a tuple
     # If offset_vals is set, then continue to perform shift function
-    if (shape_orig == new_shape) and (offset_vals is None):
-        return array
+    if (array.shape[-2:] == new_shape) and (offset_vals is None):
+        return array.reshape(shape_orig).copy()
 
-    # Input the fill values
-    if fill_val != 0:
-        try:
-            output += fill_val
-        except:
-            # If castings are different, then don't add fill_val
-            pass
+    # Initialize output with the fill values
+    # If castings are different, then don't add fill_val
+    if (fill_val != 0) and (np.can_cast(np.asarray(fill_val).dtype, array.dtype, casting='same_kind')):
+        output = np.full((nz,ny_new,nx_new), fill_val, dtype=array.dtype)
+    else:
+        output = np.zeros(shape=(nz,ny_new,nx_new), dtype=array.dtype)
         
     # Pixel shift values
     if offset_vals is not None:
         if ndim == 1:
             ny_off = 0
-            if isinstance(offset_vals, (float,int,np.int64)):
+            if isinstance(offset_vals, (int, float, np.integer)):
                 nx_off = offset_vals
             elif len(offset_vals) < 2:
                 nx_off = offset_vals[0]
@@ -940,64 +1177,37 @@ def pad_or_cut_to_size(array, new_shape, fill_val=0.0, offset_vals=None,
     else:
         nx_off = ny_off = 0
                 
-    if nx_new>nx:
-        n0 = (nx_new - nx) / 2
-        n1 = n0 + nx
-    elif nx>nx_new:
-        n0 = (nx - nx_new) / 2
-        n1 = n0 + nx_new
-    else:
-        n0, n1 = (0, nx)
-    n0 = int(n0+0.5)
-    n1 = int(n1+0.5)
-
-    if ny_new>ny:
-        m0 = (ny_new - ny) / 2
-        m1 = m0 + ny
-    elif ny>ny_new:
-        m0 = (ny - ny_new) / 2
-        m1 = m0 + ny_new
-    else:
-        m0, m1 = (0, ny)
-    m0 = int(m0+0.5)
-    m1 = int(m1+0.5)
+    # Source and destination slices along each axis
+    sx_src, sx_dst = _pad_crop_edges(nx, nx_new)
+    sy_src, sy_dst = _pad_crop_edges(ny, ny_new)
 
     if (nx_new>=nx) and (ny_new>=ny):
         #print('Case 1')
-        output[:,m0:m1,n0:n1] = array.copy()
-        for i, im in enumerate(output):
-            output[i] = shift_func(im, nx_off, ny_off, pad=True, cval=fill_val, **kwargs)
+        output[:,sy_dst,sx_dst] = array
+        output[:] = shift_func(output, nx_off, ny_off, pad=True, cval=fill_val, **kwargs)
     elif (nx_new<=nx) and (ny_new<=ny):
         #print('Case 2')
         if (nx_off!=0) or (ny_off!=0):
-            array_temp = array.copy()
-            for i, im in enumerate(array_temp):
-                array_temp[i] = shift_func(im, nx_off, ny_off, pad=True, cval=fill_val, **kwargs)
-            output = array_temp[:,m0:m1,n0:n1]
+            array_temp = shift_func(array, nx_off, ny_off, pad=True, cval=fill_val, **kwargs)
+            output = array_temp[:,sy_src,sx_src].astype(array.dtype, copy=False)
         else:
-            output = array[:,m0:m1,n0:n1]
+            output = array[:,sy_src,sx_src]
     elif (nx_new<=nx) and (ny_new>=ny):
         #print('Case 3')
         if nx_off!=0:
-            array_temp = array.copy()
-            for i, im in enumerate(array_temp):
-                array_temp[i] = shift_func(im, nx_off, 0, pad=True, cval=fill_val, **kwargs)
-            output[:,m0:m1,:] = array_temp[:,:,n0:n1]
+            array_temp = shift_func(array, nx_off, 0, pad=True, cval=fill_val, **kwargs)
         else:
-            output[:,m0:m1,:] = array[:,:,n0:n1]
-        for i, im in enumerate(output):
-            output[i] = shift_func(im, 0, ny_off, pad=True, cval=fill_val, **kwargs)
+            array_temp = array
+        output[:,sy_dst,:] = array_temp[:,:,sx_src]
+        output[:] = shift_func(output, 0, ny_off, pad=True, cval=fill_val, **kwargs)
     elif (nx_new>=nx) and (ny_new<=ny):
         #print('Case 4')
         if ny_off!=0:
-            array_temp = array.copy()
-            for i, im in enumerate(array_temp):
-                array_temp[i] = shift_func(im, 0, ny_off, pad=True, cval=fill_val, **kwargs)
-            output[:,:,n0:n1] = array_temp[:,m0:m1,:]
+            array_temp = shift_func(array, 0, ny_off, pad=True, cval=fill_val, **kwargs)
         else:
-            output[:,:,n0:n1] = array[:,m0:m1,:]
-        for i, im in enumerate(output):
-            output[i] = shift_func(im, nx_off, 0, pad=True, cval=fill_val, **kwargs)
+            array_temp = array
+        output[:,:,sx_dst] = array_temp[:,sy_src,:]
+        output[:] = shift_func(output, nx_off, 0, pad=True, cval=fill_val, **kwargs)
         
     # Flatten if input and output arrays are 1D
     if (ndim==1) and (ny_new==1):
@@ -1258,6 +1468,8 @@ def rotate_offset(data, angle, cen=None, cval=0.0, order=1,
         Do we want to reposition so that `cen` is the image center?
     shift_func : function
         Function to use for shifting. Usually either `fshift` or `fourier_imshift`.
+        Only used if `reshape=True`; otherwise, the shift and rotation are
+        performed together in a single `affine_transform` interpolation.
         
     Keyword Args
     ------------
@@ -1282,7 +1494,9 @@ def rotate_offset(data, angle, cen=None, cval=0.0, order=1,
         The parameter prefilter determines if the input is pre-filtered with
         `spline_filter` before interpolation (necessary for spline
         interpolation of order > 1).  If False, it is assumed that the input is
-        already filtered. Default is True.
+        already filtered. Default is True for order > 1, otherwise False.
+        Prefiltering is a full pass over each image; for repeated rotations
+        at order > 1, consider filtering once and setting `prefilter=False`.
 
     Returns
     -------
@@ -1310,9 +1524,11 @@ def rotate_offset(data, angle, cen=None, cval=0.0, order=1,
         kwargs['axes'] = (2,1)
     kwargs['order'] = order
     kwargs['cval'] = cval
+    # Spline prefiltering only matters for order>1
+    kwargs.setdefault('prefilter', order > 1)
 
     # xcen, ycen = (nx/2, ny/2)
-    xcen, ycen = get_im_cen(data)
+    xcen, ycen = get_im_cen(data[0] if ndim==3 else data)
     if cen is None:
         cen = (xcen, ycen)
     xcen_new, ycen_new = cen
@@ -1324,6 +1540,28 @@ def rotate_offset(data, angle, cen=None, cval=0.0, order=1,
     if np.allclose((delx, dely), 0, atol=1e-5):
         return rotate(data, angle, reshape=reshape, **kwargs).squeeze()
 
+    if not reshape:
+        # Output has the same shape as the input, so rotation, shift, and
+        # crop can be combined into a single affine transformation
+        kwargs.pop('axes', None)
+        angle = 0 if angle is None else angle
+        cos_ang = np.cos(np.deg2rad(angle))
+        sin_ang = np.sin(np.deg2rad(angle))
+        # Maps output (y,x) pixel coordinates to input coordinates
+        rot_mat = np.array([[cos_ang, sin_ang], [-sin_ang, cos_ang]])
+        cen_in = np.array([ycen_new, xcen_new])
+        cen_out = np.array([ycen, xcen]) if recenter else cen_in
+        offset = cen_in - rot_mat @ cen_out
+
+        def _affine(im):
+            return affine_transform(im, rot_mat, offset=offset, **kwargs)
+
+        images_fin = np.empty(data.shape, dtype=np.result_type(data.dtype, 'float32'))
+        _map_images(_affine, data, images_fin)
+
+        # Drop out single-valued dimensions
+        return images_fin.squeeze()
+
     # fshift interp type
     if order <=1:
         interp='linear'
@@ -1335,39 +1573,16 @@ def rotate_offset(data, angle, cen=None, cval=0.0, order=1,
     # Pad and then shift array
     # Places `cen` position at center of image
     new_shape = (int(ny+2*abs(dely)), int(nx+2*abs(delx)))
-    images_shift = []
-    for im in data:
+    def _pad_shift(im):
         # im_pad = pad_or_cut_to_size(im, new_shape, fill_val=cval)
         im_pad = crop_image(im, new_shape, fill_val=cval)
-        im_new = shift_func(im_pad, delx, dely, cval=cval, interp=interp)
-        images_shift.append(im_new)
-    images_shift = np.asarray(images_shift)
+        return shift_func(im_pad, delx, dely, cval=cval, interp=interp)
+
+    images_shift = np.empty((nz,)+new_shape, dtype=np.result_type(data.dtype, 'float32'))
+    _map_images(_pad_shift, data, images_shift)
     
-    if reshape:
-        # Rotate around current center and expand to full size
-        images_fin = rotate(images_shift, angle, reshape=True, **kwargs)
-    else:
-        # Perform cropping
-        if recenter:
-            # Keeping 'cen' position in center; no need to reshape to larger size
-            images_rot = rotate(images_shift, angle, reshape=False, **kwargs)
-        else:
-            # Reshape to larger size due to image shifting
-            images_shrot = rotate(images_shift, angle, reshape=True, **kwargs)
-            images_rot = []
-            # Shift 'cen' back to original location
-            for im in images_shrot:
-                im_new = shift_func(im, -1*delx, -1*dely, pad=True, cval=cval, interp=interp)
-                images_rot.append(im_new)
-            images_rot = np.asarray(images_rot)
-    
-        # Perform cropping
-        images_fin = []
-        for im in images_rot:
-            # im_new = pad_or_cut_to_size(im, (ny,nx))
-            im_new = crop_image(im, (ny,nx), fill_val=0)
-            images_fin.append(im_new)
-        images_fin = np.asarray(images_fin)
+    # Rotate around current center and expand to full size
+    images_fin = rotate(images_shift, angle, reshape=True, **kwargs)
     
     # Drop out single-valued dimensions
     return images_fin.squeeze()
@@ -1439,7 +1654,7 @@ def zrebin(image, oversample, order=3, mode='reflect', total=True,
                 res_trans_new = res_trans * res_scale
                 res_reshape_new = res_trans_new.reshape([oversample,oversample,shape[0],shape[1]])
                 result_new = res_reshape_new.transpose(2,0,3,1).reshape(result.shape)
-                result = result_new.copy()
+                result = result_new
                 del result_new, res_reshape_new, res_trans_new, res_scale, res_resum, res_trans, res_reshape
 
                 if not total:
@@ -1459,6 +1674,36 @@ def zrebin(image, oversample, order=3, mode='reflect', total=True,
         result = np.array([zrebin(im, oversample, **kwargs) for im in image])
         return result        
 
+def _frebin_axis(image, nout, box):
+    """Fractional rebin along the first axis of `image`
+    
+    Each output element is the sum of input elements from `istart` to 
+    `istop`, less the fractional pixels outside of the bin boundaries.
+    """
+
+    n = image.shape[0]
+
+    # Integer contraction is a simple sum over blocks
+    if float(box).is_integer() and (nout * int(box) == n):
+        return image.reshape((nout, int(box)) + image.shape[1:]).sum(axis=1)
+
+    rstart = np.arange(nout) * box
+    istart = rstart.astype(int)
+    rstop = rstart + box
+    istop = np.minimum(rstop.astype(int), n-1)
+    frac1 = rstart - istart
+    frac2 = 1.0 - (rstop - istop)
+
+    # Sum pixels from istart to istop using interleaved reduceat indices.
+    # Append zeros so that istop+1 is always a valid index.
+    im_pad = np.concatenate([image, np.zeros_like(image[:1])], axis=0)
+    ind = np.stack([istart, istop+1], axis=1).ravel()
+    sums = np.add.reduceat(im_pad, ind, axis=0)[::2]
+
+    # Broadcast fractions along remaining axes
+    sh = (-1,) + (1,) * (image.ndim - 1)
+    return sums - frac1.reshape(sh) * image[istart] - frac2.reshape(sh) * image[istop]
+
 def frebin(image, dimensions=None, scale=None, total=True):
     """Fractional rebin
     
@@ -1574,29 +1819,11 @@ def frebin(image, dimensions=None, scale=None, total=True):
         else:
             return result
 
-    ns1 = ns - 1
-    nl1 = nl - 1
-
     if nl == 1:
         #1D case
         _log.debug("Rebinning to Dimension: %s" % nsout)
         result = np.zeros(nsout)
-        for i in range(nsout):
-            rstart = i * sbox
-            istart = int(rstart)
-            rstop = rstart + sbox
-
-            if int(rstop) < ns1:
-                istop = int(rstop)
-            else:
-                istop = ns1
-
-            frac1 = float(rstart) - istart
-            frac2 = 1.0 - (rstop - istop)
-
-            #add pixel values from istart to istop and subtract fraction pixel
-            #from istart to rstart and fraction pixel from rstop to istop
-            result[i] = np.sum(image[istart:istop + 1]) - frac1 * image[istart] - frac2 * image[istop]
+        result[:] = _frebin_axis(image, nsout, sbox)
 
         if not total:
             result = result / (float(sbox) * lbox)
@@ -1613,47 +1840,11 @@ def frebin(image, dimensions=None, scale=None, total=True):
             temp = temp.astype(input_dtype)
 
         #first lines
-        for i in range(nlout):
-            rstart = i * lbox
-            istart = int(rstart)
-            rstop = rstart + lbox
-
-            if int(rstop) < nl1:
-                istop = int(rstop)
-            else:
-                istop = nl1
-
-            frac1 = float(rstart) - istart
-            frac2 = 1.0 - (rstop - istop)
-
-            if istart == istop:
-                temp[i, :] = (1.0 - frac1 - frac2) * image[istart, :]
-            else:
-                temp[i, :] = np.sum(image[istart:istop + 1, :], axis=0) -\
-                             frac1 * image[istart, :] - frac2 * image[istop, :]
-
+        temp[:] = _frebin_axis(image, nlout, lbox)
         temp = temp.T
 
         #then samples
-        for i in range(nsout):
-            rstart = i * sbox
-            istart = int(rstart)
-            rstop = rstart + sbox
-
-            if int(rstop) < ns1:
-                istop = int(rstop)
-            else:
-                istop = ns1
-
-            frac1 = float(rstart) - istart
-            frac2 = 1.0 - (rstop - istop)
-
-            if istart == istop:
-                result[i, :] = (1. - frac1 - frac2) * temp[istart, :]
-            else:
-                result[i, :] = np.sum(temp[istart:istop + 1, :], axis=0) - \
-                                      frac1 * temp[istart, :] - frac2 * temp[istop, :]
-
+        result[:] = _frebin_axis(temp, nsout, sbox)
         result = result.T
 
         if not total:
@@ -1748,9 +1939,9 @@ def image_rescale(HDUlist_or_filename, pixscale_out, pixscale_in=None,
     # always be in the central pixel (the star). So, let's save
     # and remove that flux then add back after the rebinning.
     if cen_star:
-        mask_max = image==image.max()
-        star_flux = image[mask_max][0]
-        image[mask_max] = 0
+        ind_max = np.unravel_index(np.argmax(image), image.shape)
+        star_flux = image[ind_max]
+        image[ind_max] = 0
 
     # Rebin the image to get a pixel scale that oversamples the detector pixels
     fact = imscale_new / pixscale_out
@@ -1818,13 +2009,8 @@ def model_to_hdulist(args_model, sp_star, bandpass):
         # Open file
         hdulist = fits.open(fname)
 
-    # Get rid of any non-standard header keywords
-    hdu = fits.PrimaryHDU(hdulist[0].data)
-    for k in hdulist[0].header.keys():
-        try:
-            hdu.header[k] = hdulist[0].header[k]
-        except ValueError:
-            pass
+    # Copy header without structural keywords, which are regenerated from the data
+    hdu = fits.PrimaryHDU(hdulist[0].data, header=hdulist[0].header.copy(strip=True))
     hdulist = fits.HDUList(hdu)
 
     # Break apart units0
@@ -1845,20 +2031,23 @@ def model_to_hdulist(args_model, sp_star, bandpass):
     wdel = np.linspace(-0.1,0.1)
     f_obs = np.interp(wobs_um+wdel, wstar, fstar)
     f0    = np.interp(wave_um+wdel, wstar, fstar)
-    im *= np.mean(f_obs / f0)
+    flux_scale = np.mean(f_obs / f0)
 
     # Convert to photons/sec/pixel
-    im *= bandpass.equivwidth().to_value(u.AA) * stsyn.conf.area
+    flux_scale *= bandpass.equivwidth().to_value(u.AA) * stsyn.conf.area
     # If input units are per arcsec^2 then scale by pixel scale
     # This will give ph/sec for each pixel
     if ('arcsec' in units_list[1]) or ('asec' in units_list[1]):
-        im *= scale0**2
+        flux_scale *= scale0**2
     elif 'mas' in units_list[1]:
-        im *= (scale0*1000)**2
+        flux_scale *= (scale0*1000)**2
     elif 'sr' in units_list[1].lower():
         # Steradians to arcsec^2
         sr_to_asec2 = (3600*180/np.pi)**2 # [asec^2 / sr]
-        im *= (scale0**2 / sr_to_asec2) 
+        flux_scale *= (scale0**2 / sr_to_asec2) 
+
+    # Apply all scale factors in a single pass over the image
+    im *= flux_scale
 
     # Save into HDUList
     hdulist[0].data = im
@@ -1871,9 +2060,27 @@ def model_to_hdulist(args_model, sp_star, bandpass):
     return hdulist
 
 
+@functools.lru_cache(maxsize=8)
+def _get_default_siaf(instrument, aper_name):
+    """Return (cached) default SIAF aperture for a given instrument"""
+    si_match = {
+        'NIRCAM' : siaf_nrc, 
+        'NIRSPEC': siaf_nis, 
+        'MIRI'   : siaf_mir, 
+        'NIRISS' : siaf_nrs, 
+        'FGS'    : siaf_fgs,
+        }
+
+    # Select a single SIAF aperture
+    siaf = si_match[instrument.upper()]
+    aper = siaf.apertures[aper_name]
+
+    return aper
+
 def distort_image(hdulist_or_filename, ext=0, to_frame='sci', fill_value=0, 
                   xnew_coords=None, ynew_coords=None, return_coords=False,
-                  aper=None, sci_cen=None, pixelscale=None, oversamp=None):
+                  aper=None, sci_cen=None, pixelscale=None, oversamp=None,
+                  dtype=None):
     """ Distort an image
 
     Apply SIAF instrument distortion to an image that is assumed to be in 
@@ -1882,7 +2089,8 @@ def distort_image(hdulist_or_filename, ext=0, to_frame='sci', fill_value=0,
     detector oversampling, and detector position ('sci' coords).
 
     This function then transforms the image to the new coordinate system using
-    scipy's RegularGridInterpolator (linear interpolation).
+    linear interpolation (scipy's `map_coordinates`, or `RegularGridInterpolator`
+    if extrapolating with `fill_value=None`).
 
     Parameters
     ----------
@@ -1936,25 +2144,16 @@ def distort_image(hdulist_or_filename, ext=0, to_frame='sci', fill_value=0,
     oversamp : int or None
         Oversampling of input image relative to native detector pixel scale.
         If set to None, will search for OSAMP and DET_SAMP keywords. 
+    dtype : None or data-type
+        Data type used for the interpolation and output image. Setting to
+        `np.float32` halves the memory footprint of the interpolation and
+        is sufficient for most PSFs. If None, use the input image dtype,
+        or `np.float64` if the input is not floating point (e.g., raw DN).
     """
 
     import pysiaf
     from scipy.interpolate import RegularGridInterpolator
-
-    def _get_default_siaf(instrument, aper_name):
-        si_match = {
-            'NIRCAM' : siaf_nrc, 
-            'NIRSPEC': siaf_nis, 
-            'MIRI'   : siaf_mir, 
-            'NIRISS' : siaf_nrs, 
-            'FGS'    : siaf_fgs,
-            }
-
-        # Select a single SIAF aperture
-        siaf = si_match[instrument.upper()]
-        aper = siaf.apertures[aper_name]
-
-        return aper
+    from scipy.ndimage import map_coordinates
 
     # Read in input PSF
     if isinstance(hdulist_or_filename, str):
@@ -1991,18 +2190,15 @@ def distort_image(hdulist_or_filename, ext=0, to_frame='sci', fill_value=0,
 
     # ###############################################
     # Create an array of indices (in pixels) for where the PSF is located on the detector
+    # Coordinates are separable, so work with 1D vectors and only
+    # expand to full 2D grids where required.
     nx_half, ny_half = ( (nx-1)/2., (ny-1)/2. )
     xlin = np.linspace(-1*nx_half, nx_half, nx)
     ylin = np.linspace(-1*ny_half, ny_half, ny)
-    xarr, yarr = np.meshgrid(xlin, ylin) 
 
     # Convert the PSF center point from pixels to arcseconds using pysiaf
     xidl_cen, yidl_cen = aper.sci_to_idl(xsci_cen, ysci_cen)
 
-    # Get 'idl' coords
-    xidl = xarr * pixelscale + xidl_cen
-    yidl = yarr * pixelscale + yidl_cen
-
     # ###############################################
     # Create an array of indices (in pixels) that the final data will be interpolated onto
     xnew_cen, ynew_cen = aper.convert(xsci_cen, ysci_cen, 'sci', to_frame)
@@ -2014,45 +2210,70 @@ def distort_image(hdulist_or_filename, ext=0, to_frame='sci', fill_value=0,
             assert xnew_coords.shape==ynew_coords.shape, "If new x and y inputs are a grid, must be same shapes"
             xnew, ynew = xnew_coords, ynew_coords
     elif to_frame=='sci':
-        xnew = xarr / oversamp + xnew_cen
-        ynew = yarr / oversamp + ynew_cen
+        xnew, ynew = np.meshgrid(xlin / oversamp + xnew_cen, ylin / oversamp + ynew_cen)
     else:
-        xv, yv = aper.convert(xidl, yidl, 'idl', to_frame)
+        # Get 'idl' coords
+        xidl, yidl = np.meshgrid(xlin * pixelscale + xidl_cen, ylin * pixelscale + yidl_cen)
+        if to_frame=='idl':
+            xv, yv = (xidl, yidl)
+        else:
+            xv, yv = aper.convert(xidl, yidl, 'idl', to_frame)
+        del xidl, yidl
         xmin, xmax = (xv.min(), xv.max())
         ymin, ymax = (yv.min(), yv.max())
         
-        # Range xnew from 0 to 1
-        xnew = xarr - xarr.min()
-        xnew /= xnew.max()
-        # Set to xmin to xmax
-        xnew = xnew * (xmax - xmin) + xmin
-        # Make sure center value is xnew_cen
-        xnew += xnew_cen - np.median(xnew)
-
-        # Range ynew from 0 to 1
-        ynew = yarr - yarr.min()
-        ynew /= ynew.max()
-        # Set to ymin to ymax
-        ynew = ynew * (ymax - ymin) + ymin
-        # Make sure center value is xnew_cen
-        ynew += ynew_cen - np.median(ynew)
+        # Linearly rescale to span xmin to xmax, then make sure the 
+        # center (median) value is xnew_cen
+        xscale = (xmax - xmin) / (xlin.max() - xlin.min())
+        xnew = (xlin - np.median(xlin)) * xscale + xnew_cen
+
+        # Same for y, spanning ymin to ymax and centered on ynew_cen
+        yscale = (ymax - ymin) / (ylin.max() - ylin.min())
+        ynew = (ylin - np.median(ylin)) * yscale + ynew_cen
+
+        xnew, ynew = np.meshgrid(xnew, ynew)
     
     # Convert requested coordinates to 'idl' coordinates
-    xnew_idl, ynew_idl = aper.convert(xnew, ynew, to_frame, 'idl')
+    if to_frame=='idl':
+        xnew_idl, ynew_idl = (xnew, ynew)
+    else:
+        xnew_idl, ynew_idl = aper.convert(xnew, ynew, to_frame, 'idl')
 
     # ###############################################
-    # Interpolate using Regular Grid Interpolator
+    # Interpolate onto new coordinates
+    data = hdu_list[ext].data
+    if (dtype is None) and (not np.issubdtype(data.dtype, np.floating)):
+        # Interpolate integer images as floats to avoid truncation
+        dtype = np.float64
+    if dtype is not None:
+        data = np.ascontiguousarray(data, dtype=dtype)
+    # Single-precision data gets single-precision interpolation indices
+    coord_dtype = np.float32 if data.dtype==np.float32 else np.float64
+
     xvals = xlin * pixelscale + xidl_cen
     yvals = ylin * pixelscale + yidl_cen
-    func = RegularGridInterpolator((yvals,xvals), hdu_list[ext].data, method='linear', 
-                                   bounds_error=False, fill_value=fill_value)
-
-    # Create an array of (yidl, xidl) values to interpolate onto
-    pts = np.array([ynew_idl.flatten(),xnew_idl.flatten()]).transpose()
-    psf_new = func(pts).reshape(xnew.shape)
+    if fill_value is None:
+        # Regular Grid Interpolator to extrapolate outside the domain
+        func = RegularGridInterpolator((yvals,xvals), data, method='linear', 
+                                       bounds_error=False, fill_value=fill_value)
+
+        # Create an array of (yidl, xidl) values to interpolate onto
+        pts = np.array([ynew_idl.flatten(),xnew_idl.flatten()]).transpose()
+        psf_new = func(pts).reshape(xnew.shape)
+    else:
+        # Input is a uniform grid, so convert 'idl' coords to fractional indices
+        # and perform linear interpolation with map_coordinates
+        # Index arrays are computed in place to limit temporaries
+        ry = np.subtract(ynew_idl, yvals[0], dtype=coord_dtype)
+        ry /= coord_dtype(yvals[1] - yvals[0])
+        rx = np.subtract(xnew_idl, xvals[0], dtype=coord_dtype)
+        rx /= coord_dtype(xvals[1] - xvals[0])
+        psf_new = map_coordinates(data, (ry, rx), order=1, mode='constant',
+                                  cval=fill_value, prefilter=False)
+        del ry, rx
 
     # Make sure we're not adding flux to the system via interpolation artifacts
-    sum_orig = hdu_list[ext].data.sum()
+    sum_orig = data.sum()
     sum_new = psf_new.sum()
     if sum_new > sum_orig:
         psf_new *= (sum_orig / sum_new)
@@ -2089,10 +2310,10 @@ def image_convolution(image, psf, method='scipy', use_fft=None, **kwargs):
         import astropy.convolution
 
         if use_fft:
-            from scipy import fftpack
             cfunc = astropy.convolution.convolve_fft
-            kwargs['fftn'] = fftpack.fftn
-            kwargs['ifftn'] = fftpack.ifftn
+            # Multithreaded pocketfft transforms
+            kwargs['fftn'] = functools.partial(scipy.fft.fftn, workers=-1)
+            kwargs['ifftn'] = functools.partial(scipy.fft.ifftn, workers=-1)
             kwargs['allow_huge'] = True
         else:
             # Check if PSF shape is odd in both dimensions
@@ -2125,42 +2346,89 @@ def _convolve_psfs_for_mp(arg_vals):
     specifically for convolving position-dependent PSFs with an extended image or
     field of PSFs.
 
+    Only the bounding box of non-zero pixels within `ind_mask` is convolved
+    (overlap-add). Returns the convolved tile along with the (y,x) slices 
+    where it should be added into the output image, or None if there is 
+    nothing to convolve. An optional fourth argument sets the number of 
+    FFT workers (default: all CPUs). Optional fifth and sixth arguments 
+    give a common FFT shape and the PSF transform at that shape, which
+    are passed to `_fft_convolve`.
     """
     
-    im, psf, ind_mask = arg_vals
+    im, psf, ind_mask = arg_vals[:3]
+    workers = arg_vals[3] if len(arg_vals)>3 else -1
+    fshape, psf_fft = arg_vals[4:6] if len(arg_vals)>5 else (None, None)
 
     ny, nx = im.shape
     ny_psf, nx_psf = psf.shape
 
-    try:
-        # Get region to perform convolution
-        xtra_pix = int(nx_psf/2 + 10)
-        ind = np.argwhere(ind_mask.sum(axis=0)>0)
-        ix1, ix2 = (np.min(ind), np.max(ind)+1)
-        ix1 -= xtra_pix
-        ix1 = 0 if ix1<0 else ix1
-        ix2 += xtra_pix
-        ix2 = nx if ix2>nx else ix2
-        
-        xtra_pix = int(ny_psf/2 + 10)
-        ind = np.argwhere(ind_mask.sum(axis=1))
-        iy1, iy2 = (np.min(ind), np.max(ind)+1)
-        iy1 -= xtra_pix
-        iy1 = 0 if iy1<0 else iy1
-        iy2 += xtra_pix
-        iy2 = ny if iy2>ny else iy2
-    except ValueError:
+    # Bounding box of non-zero pixels in region assigned to this PSF
+    support = ind_mask & (im != 0)
+    indy = np.flatnonzero(support.any(axis=1))
+    indx = np.flatnonzero(support.any(axis=0))
+    del support
+    if (indy.size==0) or (indx.size==0):
         # No valid data in the image
-        return 0
-    
-    im_temp = im.copy()
-    im_temp[~ind_mask] = 0
+        return None
+    iy1, iy2 = (indy[0], indy[-1]+1)
+    ix1, ix2 = (indx[0], indx[-1]+1)
+
+    tile = np.where(ind_mask[iy1:iy2,ix1:ix2], im[iy1:iy2,ix1:ix2], 0)
     
     # No need to convolve anything if no flux!
-    if not np.allclose(im_temp,0):
-        im_temp[iy1:iy2,ix1:ix2] = image_convolution(im_temp[iy1:iy2,ix1:ix2], psf)
+    if np.allclose(tile,0):
+        return None
+
+    # Full convolution of tile, which starts (n_psf-1)//2 pixels 
+    # before the tile in the output image
+    res = _fft_convolve(tile, psf, mode='full', workers=workers, 
+                        fshape=fshape, psf_fft=psf_fft)
+    oy = iy1 - (ny_psf-1)//2
+    ox = ix1 - (nx_psf-1)//2
+
+    # Crop to image boundaries
+    y1, y2 = (max(oy, 0), min(oy+res.shape[0], ny))
+    x1, x2 = (max(ox, 0), min(ox+res.shape[1], nx))
+    res = res[y1-oy:y2-oy, x1-ox:x2-ox]
+
+    return res, (slice(y1,y2), slice(x1,x2))
+
+
+def _array_key(arr):
+    """Hashable (shape, dtype, digest) key of an array's contents"""
+    arr = np.ascontiguousarray(arr)
+    return (arr.shape, arr.dtype.str, hashlib.sha1(arr).digest())
+
+def _fft_convolve(image, psf, mode='same', workers=-1, fshape=None, psf_fft=None):
+    """FFT convolution of `image` with `psf`
+
+    Equivalent to `scipy.signal.fftconvolve(image, psf, mode=mode)` for 
+    modes 'same' and 'full', but uses multithreaded real FFTs. Set 
+    `workers=1` when calling from multiple threads. To convolve several 
+    images with the same PSF, supply a common padded `fshape` (at least 
+    the full convolution size of each image) along with the PSF transform 
+    `psf_fft = scipy.fft.rfft2(psf, fshape)` so it is only computed once.
+    """
 
-    return im_temp
+    ny, nx = image.shape
+    ny_psf, nx_psf = psf.shape
+    shape = (ny + ny_psf - 1, nx + nx_psf - 1)
+    if fshape is None:
+        fshape = tuple(scipy.fft.next_fast_len(n, real=True) for n in shape)
+    if psf_fft is None:
+        psf_fft = scipy.fft.rfft2(psf, fshape, workers=workers)
+
+    im_fft = scipy.fft.rfft2(image, fshape, workers=workers)
+    im_fft *= psf_fft
+    res = scipy.fft.irfft2(im_fft, fshape, workers=workers)
+
+    if mode=='full':
+        return res[:shape[0], :shape[1]]
+
+    # Crop center region of the full convolution
+    y1 = (shape[0] - ny) // 2
+    x1 = (shape[1] - nx) // 2
+    return res[y1:y1+ny, x1:x1+nx]
 
 
 # def _convolve_psfs_for_mp_old(arg_vals):
@@ -2188,6 +2456,36 @@ def _convolve_psfs_for_mp(arg_vals):
 
 #     return res
 
+def _nearest_psf_indices(coords, xpsfs, ypsfs):
+    """Index of the nearest PSF for each (x,y) position in `coords` (shape [N,2])
+
+    Same as `np.argmin` of the distances to each (`xpsfs`, `ypsfs`) position,
+    so equidistant positions and those with non-finite coordinates are 
+    assigned to the first PSF in the list.
+    """
+
+    npsf = len(xpsfs)
+    indices = np.zeros(len(coords), dtype='int')
+    if npsf==1:
+        return indices
+
+    ind_good = np.isfinite(coords).all(axis=1)
+    if not ind_good.all():
+        coords = coords[ind_good]
+
+    tree = cKDTree(np.column_stack([xpsfs, ypsfs]))
+    dist, ind = tree.query(coords, k=2)
+    ind_near = ind[:,0]
+    # The tree does not order ties by index, so redo near-ties directly
+    ind_tie = np.isclose(dist[:,1], dist[:,0], rtol=1e-9, atol=0)
+    if ind_tie.any():
+        xy_tie = coords[ind_tie]
+        rho2 = (xy_tie[:,0:1] - xpsfs)**2 + (xy_tie[:,1:2] - ypsfs)**2
+        ind_near[ind_tie] = np.argmin(rho2, axis=1)
+
+    indices[ind_good] = ind_near
+    return indices
+
 def _crop_hdul(hdul_sci_image, psf_shape):
 
     # Science image aperture info
@@ -2303,17 +2601,9 @@ def convolve_image(hdul_sci_image, hdul_psfs, return_hdul=False,
     # Get SIAF aperture info
     hdr_psf = hdul_psfs[0].header
 
-    si_match = {
-        'NIRCAM' : siaf_nrc, 
-        'NIRSPEC': siaf_nis, 
-        'MIRI'   : siaf_mir, 
-        'NIRISS' : siaf_nrs, 
-        'FGS'    : siaf_fgs,
-        }
-
     # Select a single SIAF aperture
-    siaf = si_match[hdr_psf['INSTRUME'].upper()]
-    siaf_ap_psfs = siaf[hdr_psf['APERNAME']]
+    instrument = hdr_psf['INSTRUME'].upper()
+    siaf_ap_psfs = _get_default_siaf(instrument, hdr_psf['APERNAME'])
 
     if crop_zeros:
         hdul_sci_image_orig = hdul_sci_image
@@ -2322,7 +2612,7 @@ def convolve_image(hdul_sci_image, hdul_psfs, return_hdul=False,
     # Science image aperture info
     im_input = hdul_sci_image[0].data
     hdr_im = hdul_sci_image[0].header
-    siaf_ap_sci = siaf[hdr_im['APERNAME']]
+    siaf_ap_sci = _get_default_siaf(instrument, hdr_im['APERNAME'])
     
     # Get tel coordinates for all PSFs
     xvals = np.array([hdu.header['XVAL'] for hdu in hdul_psfs])
@@ -2351,54 +2641,83 @@ def convolve_image(hdul_sci_image, hdul_psfs, return_hdul=False,
     except:
         pixscale = hdul_psfs[0].header['PIXELSCL']
 
+    # Scale 1D coordinate vectors before expanding to a full grid
     xvals_im = np.arange(xsize).astype('float') - xcen_im
     yvals_im = np.arange(ysize).astype('float') - ycen_im
-    xarr_im, yarr_im = np.meshgrid(xvals_im, yvals_im)
     xref, yref = siaf_ap_sci.reference_point(hdr_im['CFRAME'])
     if (hdr_im['CFRAME'] == 'tel') or (hdr_im['CFRAME'] == 'idl'):
-        xarr_im *= pixscale 
-        xarr_im += xref
-        yarr_im *= pixscale
-        yarr_im += yref
+        xvals_im *= pixscale 
+        xvals_im += xref
+        yvals_im *= pixscale
+        yvals_im += yref
     elif (hdr_im['CFRAME'] == 'sci') or (hdr_im['CFRAME'] == 'det'):
-        xarr_im /= hdr_im['OSAMP']
-        xarr_im += xref
-        yarr_im /= hdr_im['OSAMP']
-        yarr_im += yref
+        xvals_im /= hdr_im['OSAMP']
+        xvals_im += xref
+        yvals_im /= hdr_im['OSAMP']
+        yvals_im += yref
+    xarr_im, yarr_im = np.meshgrid(xvals_im, yvals_im)
 
     # Convert each element in image array to tel coords
     xtel_im, ytel_im = siaf_ap_sci.convert(xarr_im, yarr_im, hdr_im['CFRAME'], 'tel')
 
-    # Create mask for input image for each PSF to convolve
     # For each pixel, find PSF that is closest on the sky
-    # Go row-by-row to save on memory
+    # Nearest-neighbor query of pixel positions against PSF positions
     npsf = len(hdul_psfs)
-    mask_arr = np.zeros([npsf, ysize, xsize], dtype='bool')
-    for iy in range(ysize):
-        rho_arr = (xtel_im[iy].reshape([-1,1]) - xtel_psfs.reshape([1,-1]))**2 \
-                + (ytel_im[iy].reshape([-1,1]) - ytel_psfs.reshape([1,-1]))**2
+    coords_im = np.column_stack([xtel_im.ravel(), ytel_im.ravel()])
+    del xtel_im, ytel_im
 
-        # Calculate indices corresponding to closest PSF for each pixel
-        im_ind = np.argmin(rho_arr, axis=1)
-
-        mask = np.asarray([im_ind==i for i in range(npsf)])
-        mask_arr[:,iy,:] = mask
-        
-    del rho_arr, im_ind, mask, xtel_im, ytel_im
-    
-    # Make sure all pixels have a mask value of 1 somewhere (and only in one mask!)
-    mask_sum = mask_arr.sum(axis=0)
-    ind_bad = (mask_sum != 1)
-    nbad = len(mask_sum[ind_bad])
-    assert np.allclose(mask_sum, 1), f"{nbad} pixels in mask not assigned a PSF."
+    im_indices = _nearest_psf_indices(coords_im, xtel_psfs, ytel_psfs)
+    im_indices = im_indices.reshape([ysize, xsize])
+    del coords_im
 
     # Split into workers
+    # Convolve each PSF region in a separate thread, with single-threaded FFTs.
+    # Each mask is only created when its convolution is performed.
+    # Only PSFs assigned to at least one non-zero pixel need to be convolved.
+    yy, xx = np.nonzero(im_input)
+    kk = im_indices[yy, xx]
+    ind_psfs = np.flatnonzero(np.bincount(kk, minlength=npsf))
+
+    # Pad all tiles to a common FFT shape set by the largest tile bounding box
+    bbox = np.zeros([4, npsf], dtype='int')
+    bbox[0:2] = np.array([[ysize], [xsize]])
+    np.minimum.at(bbox[0], kk, yy)
+    np.minimum.at(bbox[1], kk, xx)
+    np.maximum.at(bbox[2], kk, yy)
+    np.maximum.at(bbox[3], kk, xx)
+    ny_tile = (bbox[2] - bbox[0] + 1)[ind_psfs].max(initial=1)
+    nx_tile = (bbox[3] - bbox[1] + 1)[ind_psfs].max(initial=1)
+    ny_psf = max([hdul_psfs[i].data.shape[0] for i in ind_psfs], default=1)
+    nx_psf = max([hdul_psfs[i].data.shape[1] for i in ind_psfs], default=1)
+    fshape = (scipy.fft.next_fast_len(int(ny_tile + ny_psf - 1), real=True),
+              scipy.fft.next_fast_len(int(nx_tile + nx_psf - 1), real=True))
+    del yy, xx, kk, bbox
+
+    # Group regions with identical PSFs so each PSF transform is computed once
+    groups = {}
+    for i in ind_psfs:
+        groups.setdefault(_array_key(hdul_psfs[i].data), []).append(i)
+    groups = list(groups.values())
+    nconv = len(groups)
+    workers = -1 if nconv==1 else 1
+    def _run(group):
+        psf = hdul_psfs[group[0]].data
+        psf_fft = scipy.fft.rfft2(psf, fshape, workers=workers)
+        return [_convolve_psfs_for_mp((im_input, psf, im_indices==i, workers, fshape, psf_fft))
+                for i in group]
+
     im_conv = np.zeros_like(im_input)
-    worker_args = [(im_input, hdul_psfs[i].data, mask_arr[i]) for i in range(npsf)]
-    # itervals = tqdm(worker_args, desc='Convolution', leave=False)
-    itervals = worker_args
-    for wa in itervals:
-        im_conv += _convolve_psfs_for_mp(wa)
+    if nconv==1:
+        results = map(_run, groups)
+    else:
+        results = _get_thread_pool().map(_run, groups)
+    # itervals = tqdm(results, desc='Convolution', total=nconv, leave=False)
+    itervals = results
+    for res_group in itervals:
+        for res in res_group:
+            if res is not None:
+                tile, (sy, sx) = res
+                im_conv[sy, sx] += tile
 
     # Ensure there are no negative values from convolve_fft
     im_conv[im_conv<0] = 0
@@ -2527,7 +2846,7 @@ def make_disk_image(inst, disk_params, sp_star=None, pixscale_out=None, dist_out
     return hdul_disk_image
 
 def rotate_shift_image(hdul, index=0, angle=0, delx_asec=0, dely_asec=0, 
-                       shift_func=fshift, reshape=False, **kwargs):
+                       shift_func=fshift, reshape=False, out=None, **kwargs):
     """ Rotate/Shift image
     
     Rotate then offset image by some amount.
@@ -2550,6 +2869,15 @@ def rotate_shift_image(hdul, index=0, angle=0, delx_asec=0, dely_asec=0,
         Pixel scale should be included in header keyword 'PIXELSCL'.
     shift_func : function
         Function to use for shifting. Usually either `fshift` or `fourier_imshift`.
+    out : ndarray or None
+        Optional pre-allocated array to store the output image, which
+        avoids a new allocation for every call (e.g., when stamping many
+        PSFs in a loop). Must have the shape of the output image. Memory is 
+        only saved if the rotation and shift are performed in a single 
+        interpolation (see `order`); otherwise, the result is computed as 
+        usual and then copied into `out`. The data of the returned HDU is 
+        this array, so it is overwritten by the next call that reuses it; 
+        the caller is also responsible for not sharing a buffer between threads.
 
     Keyword Args
     ============
@@ -2558,6 +2886,17 @@ def rotate_shift_image(hdul, index=0, angle=0, delx_asec=0, dely_asec=0,
         The order has to be in the range 0-5. This also determines the 
         interpolation value of the shift function if `interp` is not set.
         if order <=1: interp='linear'; if order <=3; otherwise interp='cubic'.
+        Note that if `order` is not set, the rotation uses the `rotate_offset`
+        default of order=1 while the shift uses interp='cubic'.
+        If the rotation order and shift interpolation match (order 1, 3, 5 with
+        'linear', 'cubic', 'quintic') with `reshape=False`, `shift_func=fshift`,
+        and no other `rotate_offset` keywords, then the rotation and shift are 
+        performed together in a single `affine_transform` spline interpolation.
+        This is less smoothed than two successive interpolations, and pixels 
+        shifted in from beyond the image edges are filled according to `mode` 
+        and `cval` rather than wrapped around as in `fshift(..., pad=False)`.
+        Away from the edges, results agree with rotate-then-shift to within
+        interpolation errors.
     interp : str, optional
         Interpolation method to use for shifting using 'fshift' or 'opencv. 
         If not set, will default to method as described by `order` keyword.
@@ -2617,11 +2956,40 @@ def rotate_shift_image(hdul, index=0, angle=0, delx_asec=0, dely_asec=0,
         else:
             interp='quintic'
 
+    delx, dely = np.array([delx_asec, dely_asec]) / hdul[0].header['PIXELSCL']
+
+    # Rotation about the image center followed by a shift can be combined
+    # into a single affine transformation (one interpolation). Only do this
+    # if the effective rotation order matches the shift interpolation and
+    # there are no other `rotate_offset` options (e.g., `cen`, `recenter`).
+    im = hdul[index].data
+    order = kwargs.get('order', 1)
+    interp_order = {'linear': 1, 'cubic': 3, 'quintic': 5}.get(interp)
+    fuse_ok = (not reshape) and (shift_func is fshift) and (im.ndim==2) and \
+              (order == interp_order) and \
+              set(kwargs.keys()).issubset({'order', 'mode', 'cval', 'prefilter'})
+    if fuse_ok:
+        akwargs = {k: kwargs[k] for k in ('mode', 'cval') if k in kwargs}
+        akwargs['prefilter'] = kwargs.get('prefilter', order > 1)
+
+        ang_rad = np.deg2rad(-1*angle)
+        cos_ang, sin_ang = (np.cos(ang_rad), np.sin(ang_rad))
+        # Maps output (y,x) pixel coordinates to input coordinates
+        rot_mat = np.array([[cos_ang, sin_ang], [-sin_ang, cos_ang]])
+        cen = (np.array(im.shape) - 1) / 2
+        offset = cen - rot_mat @ (cen + np.array([dely, delx]))
+        im_new = affine_transform(im, rot_mat, offset=offset, order=order, 
+                                  output=out, **akwargs)
+
+        # Create new HDU and copy header
+        hdu_new = fits.PrimaryHDU(im_new)
+        hdu_new.header = hdul[index].header
+        return fits.HDUList(hdu_new)
+
     # Rotate
     im_rot = rotate_offset(hdul[index].data, -1*angle, reshape=reshape, **kwargs)
     
     # Shift
-    delx, dely = np.array([delx_asec, dely_asec]) / hdul[0].header['PIXELSCL']
     if reshape:
         # Pad based on shift values
         # pad_x1 = int(np.abs(np.floor(delx))) if delx < 0 else 0
@@ -2634,6 +3002,9 @@ def rotate_shift_image(hdul, index=0, angle=0, delx_asec=0, dely_asec=0,
         pad = ((pady,pady), (padx,padx))
         im_rot = np.pad(im_rot, pad)
     im_new = shift_func(im_rot, delx, dely, pad=False, interp=interp)
+    if out is not None:
+        out[:] = im_new
+        im_new = out
     
     # Create new HDU and copy header
     hdu_new = fits.PrimaryHDU(im_new)
@@ -8,7 +8,7 @@ from .image_manip import fourier_imshift, fshift, frebin
 from .image_manip import get_im_cen, pad_or_cut_to_size, bp_fix
 from .image_manip import apply_pixel_diffusion, add_ipc, add_ppc
 from .image_manip import crop_observation, crop_image
-from .coords import dist_image, get_sgd_offsets
+from .coords import dist_image, annulus_mask, get_sgd_offsets
 from .maths import round_int
 
 from astropy.io import fits
@@ -1455,10 +1455,8 @@ def subtract_psf(image, psf, osamp=1, bpmask=None, rin=None, rout=None,
             good_mask &= ~bpmask
 
         if (rin is not None) or (rout is not None):
-            rho = dist_image(image)
             rin = 0 if rin is None else rin
-            rout = np.inf if rout is None else rout
-            good_mask &= (rho >= rin) & (rho <= rout)
+            good_mask &= annulus_mask(image.shape, rin=rin, rout=rout)
 
         im_good = image[good_mask].flatten() - psf_offset
         psf_good = psf_det[good_mask].flatten()
@@ -1729,9 +1727,8 @@ def find_offsets(input, psf, crop=65, xlim_pix=(-3,3), ylim_pix=(-3,3),
             im = pad_or_cut_to_size(val, crop)
 
         # Create masks
-        rdist = dist_image(im)
         rin = 0 if rin is None else rin
-        rmask = (rdist>=rin) if rout is None else (rdist>=rin) & (rdist<=rout)
+        rmask = annulus_mask(im.shape, rin=rin, rout=rout)
         # Exclude 0s and NaNs
         zmask = (im!=0) & (~np.isnan(im))
         ind_mask = rmask & zmask
@@ -1820,9 +1817,8 @@ def find_offsets2(input, xoff_pix, yoff_pix, psf_sh_all, bpmasks=None,
         # print(im.shape, psf_sh_crop.shape, psf_sh_all.shape)
 
         # Create masks
-        rdist = dist_image(im)
         rin = 0 if rin is None else rin
-        rmask = (rdist>=rin) if rout is None else (rdist>=rin) & (rdist<=rout)
+        rmask = annulus_mask(im.shape, rin=rin, rout=rout)
         # Exclude 0s and NaNs
         zmask = (im!=0) & (~np.isnan(im))
         nanmask_psf = (psf_sh_crop==0) | np.isnan(psf_sh_crop)
@@ -1897,9 +1893,8 @@ def find_offsets_phase(input, psf, crop=65, rin=0, rout=None, dxy_fine=0.01,
             im = crop_image(imfull, crop, fill_val=0)
 
         # Create masks
-        rdist = dist_image(im)
         rin = 0 if rin is None else rin
-        rmask = (rdist>=rin) if rout is None else (rdist>=rin) & (rdist<=rout)
+        rmask = annulus_mask(im.shape, rin=rin, rout=rout)
         # Exclude 0s and NaNs
         zmask = (im!=0) & (~np.isnan(im))
         ind_mask = rmask & zmask
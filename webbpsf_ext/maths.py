@@ -1,7 +1,7 @@
 # Import libraries
+import functools
 import numpy as np
 from numpy.polynomial import legendre
-from scipy.special import eval_legendre
 from scipy import stats
 
 from .coords import dist_image
@@ -11,6 +11,24 @@ from .image_manip import frebin
 #    Polynomial fitting
 ###########################################################################
 
+def _legendre_basis(lxvals, deg):
+    """Legendre polynomials of degree 0 to `deg` evaluated at `lxvals`
+
+    Equivalent to `np.asarray([scipy.special.eval_legendre(n, lxvals) for n in range(deg+1)])`
+    using Bonnet's recursion, with scalar factors combined before multiplying 
+    arrays: P_n = ((2n-1)/n) * x * P_{n-1} - ((n-1)/n) * P_{n-2}
+    """
+    lxvals = np.asarray(lxvals, dtype='float')
+    xfan = np.empty((deg+1, lxvals.size))
+    xfan[0] = 1
+    if deg>0:
+        xfan[1] = lxvals.ravel()
+    for n in range(2, deg+1):
+        np.multiply(xfan[n-1], xfan[1], out=xfan[n])
+        xfan[n] *= (2*n-1) / n
+        xfan[n] -= ((n-1) / n) * xfan[n-2]
+    return xfan
+
 def jl_poly(xvals, coeff, dim_reorder=False, use_legendre=False, lxmap=None, **kwargs):
     """Evaluate polynomial
     
@@ -97,15 +115,22 @@ def jl_poly(xvals, coeff, dim_reorder=False, use_legendre=False, lxmap=None, **k
         # Use Identity matrix to evaluate each polynomial component
         # xfan = legendre.legval(lxvals, np.identity(dim[0]))
         # Below method is faster for large lxvals
-        xfan = np.asarray([eval_legendre(nn, lxvals) for nn in range(dim[0])])
+        xfan = _legendre_basis(lxvals, dim[0]-1)
     else:
-        # Create an array of exponent values
-        parr = np.arange(dim[0], dtype='float')
-        # If 3D, this reshapes xfan to 2D
-        xfan = xvals**parr.reshape((-1,1)) # Array broadcasting
+        # Powers of xvals for each polynomial degree, built up by 
+        # repeated multiplication rather than calls to `pow`
+        xfan = np.empty((dim[0], nx))
+        xfan[0] = 1
+        if dim[0]>1:
+            xfan[1] = xvals
+        for i in range(2, dim[0]):
+            np.multiply(xfan[i-1], xvals, out=xfan[i])
 
     # Reshape coeffs to 2D array
     cf = coeff.reshape(dim[0],-1)
+    # Keep single-precision coefficients in single precision
+    if cf.dtype==np.float32:
+        xfan = xfan.astype(np.float32)
     if dim_reorder:
         # Coefficients are assumed (deg+1,nx,ny)
         # xvals have length nz
@@ -133,6 +158,46 @@ def jl_poly(xvals, coeff, dim_reorder=False, use_legendre=False, lxmap=None, **k
     return yfit
 
 
+@functools.lru_cache(maxsize=32)
+def _jl_poly_fit_inverse(xvals, deg, QR, use_legendre, lxmap):
+    """Least-squares inverse of the `jl_poly_fit` design matrix
+
+    Returns a read-only array `ainv` of shape (deg+1, nx) such that the
+    best-fit coefficients for data `b` of shape (nx, npix) are `ainv @ b`.
+    Arguments must be hashable: `xvals` is a tuple of x values and `lxmap`
+    is a tuple (or None if `use_legendre` is False).
+    """
+    x = np.array(xvals, dtype='float')
+
+    # Get different components to fit
+    if use_legendre:
+        # Remap xvals -> lxvals
+        dx = lxmap[1] - lxmap[0]
+        lx = 2 * (x - (lxmap[0] + dx/2)) / dx
+
+        # Use Identity matrix to evaluate each polynomial component
+        # a = legendre.legval(lx, np.identity(deg+1))
+        # Below method is faster for large lxvals
+        a = _legendre_basis(lx, deg)
+    else:
+        x = x / np.mean(x)
+        a = np.asarray([x**num for num in range(deg+1)], dtype='float')
+
+    # Fast method, but numerically unstable for overdetermined systems
+    #cov = np.linalg.pinv(np.matmul(a,a.T))
+    #coeff_all = np.matmul(cov,np.matmul(a,b))
+
+    if QR:
+        # Perform QR decomposition of the A matrix
+        q, r = np.linalg.qr(a.T, 'reduced')
+        # solving R*x = Q^T*b for x = ainv @ b
+        ainv = np.linalg.lstsq(r, q.T, rcond=None)[0]
+    else:
+        ainv = np.linalg.lstsq(a.T, np.identity(a.shape[1]), rcond=None)[0]
+
+    ainv.flags.writeable = False
+    return ainv
+
 def jl_poly_fit(x, yvals, deg=1, QR=True, robust_fit=False, niter=25, use_legendre=False, lxmap=None, **kwargs):
     """Fast polynomial fitting
     
@@ -202,41 +267,27 @@ def jl_poly_fit(x, yvals, deg=1, QR=True, robust_fit=False, niter=25, use_legend
     else:
         assert len(x)==orig_shape[0], 'X and Y.shape[0] must have the same length'
 
-    # Get different components to fit
+    x = np.asarray(x, dtype='float')
     if use_legendre:
         # Values to map to [-1,+1]
         if lxmap is None:
             lxmap = [np.min(x), np.max(x)]
-
-        # Remap xvals -> lxvals
-        dx = lxmap[1] - lxmap[0]
-        lx = 2 * (x - (lxmap[0] + dx/2)) / dx
-
-        # Use Identity matrix to evaluate each polynomial component
-        # a = legendre.legval(lx, np.identity(deg+1))
-        # Below method is faster for large lxvals
-        a = np.asarray([eval_legendre(n, lx) for n in range(deg+1)])
+        lxmap = (float(lxmap[0]), float(lxmap[1]))
     else:
         # Normalize x values to closer to 1 for numerical stability with large inputs
         xnorm = np.mean(x)
+        lxmap = None
+
+    # Least-squares inverse of the design matrix (deg+1, nx), which only
+    # depends on the x values, so is shared by repeated fits on the same grid
+    ainv = _jl_poly_fit_inverse(tuple(x.tolist()), deg, QR, use_legendre, lxmap)
+    if not use_legendre:
         x = x / xnorm
-        a = np.asarray([x**num for num in range(deg+1)], dtype='float')
     b = yvals.reshape([orig_shape[0],-1])
 
-    # Fast method, but numerically unstable for overdetermined systems
-    #cov = np.linalg.pinv(np.matmul(a,a.T))
-    #coeff_all = np.matmul(cov,np.matmul(a,b))
-    
-    if QR:
-        # Perform QR decomposition of the A matrix
-        q, r = np.linalg.qr(a.T, 'reduced')
-        # computing Q^T*b (project b onto the range of A)
-        # Use np.matmul instead of np.dot for speed improvement
-        qTb = np.matmul(q.T,b) # q.T @ b 
-        # solving R*x = Q^T*b
-        coeff_all = np.linalg.lstsq(r, qTb, rcond=None)[0]
-    else:
-        coeff_all = np.linalg.lstsq(a.T, b, rcond=None)[0]
+    # Apply to all pixels with a single matrix multiplication.
+    # Use np.matmul instead of np.dot for speed improvement
+    coeff_all = np.matmul(ainv, b) # ainv @ b
         
     if robust_fit:
         # Normally, we would weight both the x and y (ie., a and b) values
@@ -275,12 +326,7 @@ def jl_poly_fit(x, yvals, deg=1, QR=True, robust_fit=False, niter=25, use_legend
             # Ignore fits with no outliers
             ind_fit = outliers.sum(axis=0) > 0
             if ind_fit[ind_fit].size == 0: break
-            if QR:
-                # Use np.matmul instead of np.dot for speed improvement
-                qTb = np.matmul(q.T,yvals_fix[:,ind_fit]) # q.T @ yvals_fix[:,ind_fit] 
-                coeff_all[:,ind_fit] = np.linalg.lstsq(r, qTb, rcond=None)[0]
-            else:
-                coeff_all[:,ind_fit] = np.linalg.lstsq(a.T, yvals_fix[:,ind_fit], rcond=None)[0]
+            coeff_all[:,ind_fit] = np.matmul(ainv, yvals_fix[:,ind_fit])
 
             prev_err = medabsdev(abs_resid, axis=0) if i==0 else err
             err = medabsdev(abs_resid, axis=0)
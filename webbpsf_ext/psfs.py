@@ -191,24 +191,11 @@ def gen_image_from_coeff(inst, coeff, coeff_hdr, sp_norm=None, nwaves=None,
     w2 = wgood.max()
     wrange = w2 - w1
 
-    # Create a PSF for each wgood wavelength
+    # Binned e/sec at each wavelength for each spectrum/observation
+    binflux_list = [obs.sample_binned(flux_unit='count').value for obs in obs_list]
+
     use_legendre = True if coeff_hdr['LEGNDR'] else False
     lxmap = [coeff_hdr['WAVE1'], coeff_hdr['WAVE2']]
-    psf_fit = jl_poly(wgood, coeff, use_legendre=use_legendre, lxmap=lxmap)
-
-    # Multiply each monochromatic PSFs by the binned e/sec at each wavelength
-    # Array broadcasting: [nx,ny,nwave] x [1,1,nwave]
-    # Do this for each spectrum/observation
-    if nspec==1:
-        binflux = obs_list[0].sample_binned(flux_unit='count').value
-        psf_fit *= binflux.reshape([-1,1,1])
-        psf_list = [psf_fit]
-    else:
-        psf_list = []
-        for obs in obs_list:
-            binflux = obs.sample_binned(flux_unit='count').value
-            psf_list.append(psf_fit*binflux.reshape([-1,1,1]))
-        del psf_fit
 
     # The number of pixels to span spatially
     fov_pix = int(coeff_hdr['FOVPIX'])
@@ -217,6 +204,21 @@ def gen_image_from_coeff(inst, coeff, coeff_hdr, sp_norm=None, nwaves=None,
 
     # Grism spectroscopy
     if is_grism:
+        # Create a PSF for each wgood wavelength
+        psf_fit = jl_poly(wgood, coeff, use_legendre=use_legendre, lxmap=lxmap)
+
+        # Multiply each monochromatic PSFs by the binned e/sec at each wavelength
+        # Array broadcasting: [nx,ny,nwave] x [1,1,nwave]
+        # Do this for each spectrum/observation
+        if nspec==1:
+            psf_fit *= binflux_list[0].reshape([-1,1,1])
+            psf_list = [psf_fit]
+        else:
+            psf_list = []
+            for binflux in binflux_list:
+                psf_list.append(psf_fit*binflux.reshape([-1,1,1]))
+            del psf_fit
+
         pupil_mask = inst.pupil_mask
         if 'GRISM0' in pupil_mask:
             pupil_mask = 'GRISMR'
@@ -304,12 +306,20 @@ def gen_image_from_coeff(inst, coeff, coeff_hdr, sp_norm=None, nwaves=None,
 
     # Imaging
     else:
+        # Polynomial evaluation and flux-weighted sum over wavelengths are combined,
+        #   sum_w flux(w) * sum_k c_k P_k(w) = sum_k c_k * [sum_w flux(w) P_k(w)],
+        # so that a cube of monochromatic PSFs (nwave,ny,nx) is never created.
+        ncoeff = coeff.shape[0]
+        basis = jl_poly(wgood, np.identity(ncoeff), use_legendre=use_legendre, lxmap=lxmap)
+        basis = basis.reshape([-1,ncoeff])
+
         # Create source image slopes (no noise)
         data_list = []
         data_list_over = []
         eps = np.finfo(float).eps
-        for psf_fit in psf_list:
-            data_over = psf_fit.sum(axis=0)
+        for binflux in binflux_list:
+            weights = (binflux @ basis).astype(coeff.dtype, copy=False)
+            data_over = np.tensordot(weights, coeff, axes=1)
             data_over[data_over<=eps] = data_over[data_over>eps].min() / 10
             data_list_over.append(data_over)
             data_list.append(krebin(data_over, (fov_pix,fov_pix)))
@@ -0,0 +1,78 @@
+import numpy as np
+
+from webbpsf_ext import coords
+
+def test_annulus_mask():
+    """Test that `annulus_mask` matches thresholding of `dist_image`"""
+
+    im = np.zeros([50,61])
+    for center in [None, (20.3, 31.7)]:
+        rho = coords.dist_image(im, center=center)
+        for rin, rout in [(0, None), (5, 10), (3.5, 15.2)]:
+            mask = coords.annulus_mask(im.shape, rin=rin, rout=rout, center=center)
+            mask_rho = (rho >= rin) if rout is None else (rho >= rin) & (rho <= rout)
+            assert np.array_equal(mask, mask_rho)
+
+def test_xy_rot():
+    """Test that `xy_rot` agrees with conversion through polar coordinates"""
+
+    rng = np.random.default_rng(1234)
+    x, y = rng.normal(size=(2,100))
+    ang = 37.5
+
+    r, theta = coords.xy_to_rtheta(x, y)
+    xrot1, yrot1 = coords.rtheta_to_xy(r, theta + ang)
+    xrot2, yrot2 = coords.xy_rot(x, y, ang)
+
+    assert np.allclose(xrot1, xrot2)
+    assert np.allclose(yrot1, yrot2)
+
+    # Scalar inputs return scalars
+    xrot, yrot = coords.xy_rot(0, 1, 90)
+    assert np.isscalar(xrot) and np.isscalar(yrot)
+    assert np.allclose([xrot, yrot], [-1, 0])
+
+def test_get_idl_offset_seed():
+    """Test that seeded `get_idl_offset` draws slew then dither errors"""
+
+    base_offset, dith_offset = ((0.1, -0.2), (0.015, 0.01))
+    rng = np.random.default_rng(42)
+    base_rand = rng.normal(loc=np.array(base_offset)*1000, scale=5.0)
+    dith_rand = rng.normal(loc=np.array(dith_offset)*1000, scale=2.5)
+
+    offset = coords.get_idl_offset(base_offset, dith_offset, base_std=None, 
+                                   dith_std=None, rand_seed=42)
+    assert np.allclose(offset, (base_rand + dith_rand) / 1000)
+
+def test_gen_sgd_offsets():
+    """Test seeded `gen_sgd_offsets` for single and multiple realizations"""
+
+    slew_std, fsm_std = (5, 2.5)
+    xnom, ynom = np.array(coords.get_sgd_offsets('5box')) * 1000
+    npos = xnom.size
+
+    # Single realization draws slew errors then FSM errors
+    rng = np.random.default_rng(42)
+    x_point, y_point = rng.normal(scale=slew_std, size=2)
+    x_fsm = rng.normal(scale=fsm_std, size=npos)
+    y_fsm = rng.normal(scale=fsm_std, size=npos)
+    x_fsm[0] = y_fsm[0] = 0
+
+    xoff, yoff = coords.gen_sgd_offsets('5box', slew_std=slew_std, fsm_std=fsm_std, rand_seed=42)
+    assert xoff.shape == yoff.shape == (npos,)
+    assert np.allclose(xoff, (xnom + x_point + x_fsm) / 1000)
+    assert np.allclose(yoff, (ynom + y_point + y_fsm) / 1000)
+
+    # Each realization has its own slew offset applied to all positions
+    xoff, yoff = coords.gen_sgd_offsets('5box', slew_std=slew_std, fsm_std=0, 
+                                        rand_seed=42, n_realizations=4)
+    assert xoff.shape == yoff.shape == (4, npos)
+    dx, dy = (xoff - xnom / 1000, yoff - ynom / 1000)
+    assert np.allclose(dx, dx[:,:1]) and np.allclose(dy, dy[:,:1])
+    assert np.unique(dx[:,0]).size == 4
+
+    # FSM errors are not applied to the central position
+    xoff, yoff = coords.gen_sgd_offsets('5box', slew_std=0, fsm_std=fsm_std, 
+                                        rand_seed=42, n_realizations=4)
+    assert np.allclose(xoff[:,0], xnom[0] / 1000) and np.allclose(yoff[:,0], ynom[0] / 1000)
+    assert np.all(np.std(xoff[:,1:], axis=0) > 0)
@@ -0,0 +1,327 @@
+import pytest
+import numpy as np
+from astropy.io import fits
+
+from webbpsf_ext import image_manip
+
+def _gauss_image(shape, xpos, ypos, sigma=2.0):
+    """Gaussian source centered at (xpos, ypos)"""
+    yy, xx = np.indices(shape, dtype='float')
+    return np.exp(-((xx-xpos)**2 + (yy-ypos)**2) / (2*sigma**2))
+
+def _centroid(im):
+    """Flux-weighted (x, y) position"""
+    yy, xx = np.indices(im.shape, dtype='float')
+    return np.array([(xx*im).sum(), (yy*im).sum()]) / im.sum()
+
+def _fshift_ref(im, delx, dely, pad=False, cval=0.0):
+    """Bilinear shift of a 2D image using padding and `np.roll`"""
+    intx, inty = (int(np.floor(delx)), int(np.floor(dely)))
+    fracx, fracy = (delx - intx, dely - inty)
+    padx, pady = (abs(intx)+5, abs(inty)+5) if pad else (0, 0)
+    out = np.pad(im, ((pady,pady),(padx,padx)), constant_values=cval)
+    out = np.roll(out, (inty, intx), axis=(0,1))
+    out = out * ((1-fracx)*(1-fracy)) + \
+          np.roll(out, 1, axis=0) * ((1-fracx)*fracy) + \
+          np.roll(out, 1, axis=1) * ((1-fracy)*fracx) + \
+          np.roll(out, (1,1), axis=(0,1)) * (fracx*fracy)
+    return out[pady:pady+im.shape[0], padx:padx+im.shape[1]]
+
+def _pad_or_cut_ref(im, new_shape, fill_val=0.0, offset_vals=None):
+    """Shift a 2D image on a padded canvas, then crop about the center"""
+    (ny, nx), (ny_new, nx_new) = (im.shape, new_shape)
+    dy, dx = (0, 0) if offset_vals is None else offset_vals
+    npad = 10
+    out = np.pad(im, npad, constant_values=fill_val)
+    out = _fshift_ref(out, dx, dy)
+    x0 = npad - (nx_new-nx+1)//2 if nx_new>=nx else npad + (nx-nx_new+1)//2
+    y0 = npad - (ny_new-ny+1)//2 if ny_new>=ny else npad + (ny-ny_new+1)//2
+    return out[y0:y0+ny_new, x0:x0+nx_new]
+
+def test_rotate_offset_cen():
+    """Test `rotate_offset` positions for `cen` with and without `recenter`"""
+
+    shape = (81, 91)
+    im_cen = image_manip.get_im_cen(np.zeros(shape))
+    cen = np.array([37.3, 45.6])
+    angle = 35
+    dxy = np.array([6., 4.])
+
+    # Displacement of an offset source rotating about the image center
+    im = _gauss_image(shape, *(im_cen + dxy))
+    im_rot = image_manip.rotate_offset(im, angle, reshape=False)
+    dxy_rot = _centroid(im_rot) - im_cen
+
+    # Source at `cen` lands at image center, or stays put if not recentering
+    for recenter, cen_out in [(True, im_cen), (False, cen)]:
+        im = _gauss_image(shape, *cen)
+        im_rot = image_manip.rotate_offset(im, angle, cen=cen, reshape=False, recenter=recenter)
+        assert im_rot.shape == shape
+        assert np.allclose(_centroid(im_rot), cen_out, atol=0.05)
+
+        # Offset source rotates about `cen`
+        im = _gauss_image(shape, *(cen + dxy))
+        im_rot = image_manip.rotate_offset(im, angle, cen=cen, reshape=False, recenter=recenter)
+        assert np.allclose(_centroid(im_rot), cen_out + dxy_rot, atol=0.05)
+
+def test_rotate_shift_image_fused():
+    """Test single-interpolation path of `rotate_shift_image` against rotate-then-shift"""
+
+    shape = (64, 64)
+    xpos, ypos = (35.2, 27.9)
+    im = _gauss_image(shape, xpos, ypos, sigma=3.0) + 0.1
+    hdul = fits.HDUList(fits.PrimaryHDU(im))
+    hdul[0].header['PIXELSCL'] = 0.1
+
+    angle, delx, dely = (30, 1.3, -2.1)
+    kw = {'angle': angle, 'delx_asec': delx/10, 'dely_asec': dely/10}
+
+    def _two_step(order=1, interp='linear', **kwargs):
+        im_rot = image_manip.rotate_offset(im, -1*angle, reshape=False, order=order, **kwargs)
+        return image_manip.fshift(im_rot, delx, dely, pad=False, interp=interp)
+
+    # Fused path fills edges with cval rather than wrapping, so compare interior
+    yy, xx = np.indices(shape)
+    xc, yc = image_manip.get_im_cen(im)
+    ind = np.hypot(xx-xc, yy-yc) < 25
+
+    im_fuse = image_manip.rotate_shift_image(hdul, order=1, **kw)[0].data
+    im_step = _two_step()
+    assert im_fuse.shape == im_step.shape == shape
+    assert np.allclose(_centroid(ind*(im_fuse-0.1)), _centroid(ind*(im_step-0.1)), atol=0.05)
+    assert np.abs(im_fuse - im_step)[ind].max() < 0.05
+
+    # Without rotation, pixels shifted in from beyond the edge are set to cval
+    im_shift = image_manip.rotate_shift_image(hdul, delx_asec=delx/10, order=1)[0].data
+    assert np.all(im_shift[:,0] == 0)
+    assert np.allclose(im_shift[:,2:], image_manip.fshift(im, delx, 0)[:,2:])
+
+    # Fusing depends on the effective order, not on which keywords are set
+    im_interp = image_manip.rotate_shift_image(hdul, interp='linear', **kw)[0].data
+    assert np.array_equal(im_interp, im_fuse)
+    im_ord0 = image_manip.rotate_shift_image(hdul, order=0, **kw)[0].data
+    assert np.array_equal(im_ord0, _two_step(order=0))
+
+    # Other `rotate_offset` keywords use the two-step path
+    cen = (30.4, 33.1)
+    im_cen = image_manip.rotate_shift_image(hdul, cen=cen, order=1, **kw)[0].data
+    assert np.array_equal(im_cen, _two_step(cen=cen))
+
+def test_distort_image_interp():
+    """Test `distort_image` interpolation against `RegularGridInterpolator`"""
+
+    import pysiaf
+    from scipy.interpolate import RegularGridInterpolator
+
+    aper = pysiaf.Siaf('NIRCam')['NRCA1_FULL']
+    ny, nx = (40, 51)
+    osamp, pixelscale = (4, aper.XSciScale / 4)
+    sci_cen = (1024.3, 1000.7)
+    kw = {'aper': aper, 'sci_cen': sci_cen, 'pixelscale': pixelscale, 
+          'oversamp': osamp, 'fill_value': 0, 'return_coords': True}
+
+    # Input image grid in 'idl' coordinates
+    xidl_cen, yidl_cen = aper.sci_to_idl(*sci_cen)
+    xvals = (np.arange(nx) - (nx-1)/2) * pixelscale + xidl_cen
+    yvals = (np.arange(ny) - (ny-1)/2) * pixelscale + yidl_cen
+
+    im = 1000 * _gauss_image((ny,nx), 26.3, 18.2, sigma=4.0)
+    for data in [im, im.astype('float32'), im.astype('int32')]:
+        hdul = fits.HDUList(fits.PrimaryHDU(data))
+        psf, xsci, ysci = image_manip.distort_image(hdul, **kw)
+
+        xidl, yidl = aper.convert(xsci, ysci, 'sci', 'idl')
+        func = RegularGridInterpolator((yvals, xvals), data.astype('float'), 
+                                       bounds_error=False, fill_value=0)
+        psf_ref = func((yidl, xidl))
+        if psf_ref.sum() > data.sum():
+            psf_ref *= data.sum() / psf_ref.sum()
+
+        dtype_out = np.float32 if data.dtype==np.float32 else np.float64
+        assert psf.dtype == dtype_out
+        assert np.allclose(psf, psf_ref, rtol=1e-4, atol=1e-3)
+
+def test_fshift_int_cval():
+    """Test whole-pixel `fshift` of integer images casts `cval` like `np.pad`"""
+
+    im = np.arange(30).reshape([5,6])
+    delx, dely = (2, -1)
+    for interp in ['linear', 'cubic']:
+        im_pad = np.pad(im, 5, constant_values=7.6)
+        im_ref = np.roll(im_pad, (dely, delx), axis=(0,1))[5:-5,5:-5]
+        im_shift = image_manip.fshift(im, delx, dely, pad=True, cval=7.6, interp=interp)
+        assert im_shift.dtype == im.dtype
+        assert np.array_equal(im_shift, im_ref)
+
+        with pytest.raises(ValueError):
+            image_manip.fshift(im, delx, dely, pad=True, cval=np.nan, interp=interp)
+
+def test_fshift_stack():
+    """Test bilinear `fshift` of image cubes against shifting each image"""
+
+    rng = np.random.default_rng(1234)
+    for shape in [(3,20,20), (3,21,21), (2,17,24)]:
+        cube = rng.normal(size=shape)
+        for delx, dely in [(2.3, -1.6), (-0.4, 3), (0, 1.5), (-2, 1)]:
+            for pad, cval in [(False, 0), (True, 0), (True, 1.5)]:
+                im_ref = [_fshift_ref(im, delx, dely, pad=pad, cval=cval) for im in cube]
+                im_shift = image_manip.fshift(cube, delx, dely, pad=pad, cval=cval)
+                assert np.allclose(im_shift, im_ref)
+
+                im_shift = image_manip.fshift(cube.astype('float32'), delx, dely, pad=pad, cval=cval)
+                assert im_shift.dtype == np.float32
+                assert np.allclose(im_shift, im_ref, atol=1e-5)
+
+    # NaN padding of integer cubes raises like `np.pad`
+    cube = np.ones([2,5,6], dtype='int')
+    with pytest.raises(ValueError):
+        image_manip.fshift(cube, 1.5, 0.5, pad=True, cval=np.nan)
+
+def test_fshift_noop_copy():
+    """Test that `fshift` without a shift returns a new array"""
+
+    for shape in [(10,), (10,12), (3,10,12)]:
+        arr = np.ones(shape)
+        arr_shift = image_manip.fshift(arr, 0, 0)
+        assert np.array_equal(arr_shift, arr)
+        assert not np.shares_memory(arr_shift, arr)
+
+def test_pad_or_cut_to_size_stack():
+    """Test `pad_or_cut_to_size` of image cubes against a padded canvas reference"""
+
+    rng = np.random.default_rng(1234)
+    for shape in [(3,20,20), (3,21,21), (2,17,24)]:
+        cube = rng.normal(size=shape)
+        for new_shape in [(26,31), (15,12), (25,11), (13,30), shape[1:]]:
+            for offset_vals, fill_val in [(None, 0), ((1.4,-2.3), 0), ((-1,2), 1.5)]:
+                kw = {'fill_val': fill_val, 'offset_vals': offset_vals}
+                im_ref = np.array([_pad_or_cut_ref(im, new_shape, **kw) for im in cube])
+
+                im_out = image_manip.pad_or_cut_to_size(cube, new_shape, **kw)
+                assert im_out.shape == (shape[0],) + new_shape
+                assert np.allclose(im_out, im_ref)
+
+                im_out = image_manip.pad_or_cut_to_size(cube.astype('float32'), new_shape, **kw)
+                assert im_out.dtype == np.float32
+                assert np.allclose(im_out, im_ref, atol=1e-5)
+
+                im_out = image_manip.pad_or_cut_to_size(cube[0], new_shape, **kw)
+                assert np.allclose(im_out, im_ref[0])
+
+        # Unchanged shape returns a new array
+        im_out = image_manip.pad_or_cut_to_size(cube, shape[1:])
+        assert np.array_equal(im_out, cube)
+        assert not np.shares_memory(im_out, cube)
+
+def test_nearest_psf_indices():
+    """Test nearest PSF assignment against `np.argmin` of distances"""
+
+    rng = np.random.default_rng(1234)
+
+    # Regular grid of PSFs gives many equidistant pixels
+    xgrid = np.arange(5) * 10.
+    xpsfs, ypsfs = [a.ravel() for a in np.meshgrid(xgrid, xgrid)]
+    xy = np.meshgrid(np.linspace(-5, 45, 101), np.linspace(-5, 45, 101))
+    coords_grid = np.column_stack([a.ravel() for a in xy])
+    coords_rand = rng.uniform(-5, 45, size=(500,2))
+    xy_rand = rng.uniform(-5, 45, size=(2,7))
+
+    for (xp, yp), coords in [((xpsfs, ypsfs), coords_grid), (xy_rand, coords_rand), 
+                             (xy_rand[:,:1], coords_rand)]:
+        # Pixels without valid coordinates go to the first PSF
+        coords = coords.copy()
+        coords[::37] = np.nan
+        rho2 = (coords[:,0:1] - xp)**2 + (coords[:,1:2] - yp)**2
+        ind_ref = np.argmin(rho2, axis=1)
+        assert np.array_equal(image_manip._nearest_psf_indices(coords, xp, yp), ind_ref)
+
+def _frebin_ref(arr, nout):
+    """Fractional rebin of a 1D array, looping over output pixels"""
+    n = arr.size
+    box = n / nout
+    out = np.zeros(nout)
+    for i in range(nout):
+        rstart = i * box
+        istart = int(rstart)
+        rstop = rstart + box
+        istop = min(int(rstop), n-1)
+        frac1 = rstart - istart
+        frac2 = 1.0 - (rstop - istop)
+        out[i] = arr[istart:istop+1].sum() - frac1*arr[istart] - frac2*arr[istop]
+    return out
+
+def test_frebin():
+    """Test `frebin` against rebinning each axis pixel-by-pixel"""
+
+    rng = np.random.default_rng(1234)
+
+    # 1D arrays
+    for n, nout in [(20, 7), (21, 50), (30, 12)]:
+        arr = rng.uniform(size=n)
+        arr_ref = _frebin_ref(arr, nout)
+        assert np.allclose(image_manip.frebin(arr, dimensions=nout), arr_ref)
+        assert np.allclose(image_manip.frebin(arr, dimensions=nout, total=False), arr_ref * nout / n)
+
+    # 2D images of odd/even/non-square sizes, expanding and contracting
+    for shape, shape_out in [((20,20), (7,7)), ((21,21), (50,50)), ((20,30), (10,12)), ((17,24), (40,9))]:
+        im = rng.uniform(size=shape)
+        im_ref = np.array([_frebin_ref(row, shape_out[0]) for row in im.T]).T
+        im_ref = np.array([_frebin_ref(row, shape_out[1]) for row in im_ref])
+        assert np.allclose(image_manip.frebin(im, dimensions=shape_out), im_ref)
+
+        im_out = image_manip.frebin(im.astype('float32'), dimensions=shape_out)
+        assert im_out.dtype == np.float32
+        assert np.allclose(im_out, im_ref, rtol=1e-5)
+
+        im_out = image_manip.frebin(np.array([im, 2*im]), dimensions=shape_out)
+        assert np.allclose(im_out, [im_ref, 2*im_ref])
+
+def test_convolve_image():
+    """Test overlap-add `convolve_image` against convolving each PSF region"""
+
+    import pysiaf
+    from scipy.signal import fftconvolve
+
+    apname, osamp = ('NRCA1_FULL', 2)
+    xref, yref = pysiaf.Siaf('NIRCam')[apname].reference_point('sci')
+
+    # PSFs of odd, even, and non-square sizes; the last is a copy of the first
+    psf_shapes = [(15,15), (16,16), (13,18), (15,15)]
+    dxy_sci = [(-30,-20), (30,-20), (-30,25), (30,25)]
+    psfs = [_gauss_image(sh, (sh[1]-1)/2+0.3, (sh[0]-1)/2-0.2, sigma=2.0) for sh in psf_shapes]
+    psfs[3] = psfs[0].copy()
+    hdul_psfs = fits.HDUList([fits.ImageHDU(psf) for psf in psfs])
+    for hdu, (dx, dy) in zip(hdul_psfs, dxy_sci):
+        hdu.header['INSTRUME'] = 'NIRCAM'
+        hdu.header['APERNAME'] = apname
+        hdu.header['CFRAME'] = 'sci'
+        hdu.header['XVAL'] = xref + dx
+        hdu.header['YVAL'] = yref + dy
+
+    # Zero-padded image with a clump of sources near each PSF position
+    rng = np.random.default_rng(1234)
+    im = np.zeros([240,200])
+    xind_ref, yind_ref = (99.5, 119.5)
+    im_ref = np.zeros_like(im)
+    for psf, (dx, dy) in zip(psfs, dxy_sci):
+        xc, yc = (int(xind_ref + dx*osamp), int(yind_ref + dy*osamp))
+        clump = np.zeros_like(im)
+        clump[yc-8:yc+9, xc-8:xc+9] = rng.uniform(size=(17,17)) * (rng.uniform(size=(17,17)) > 0.7)
+        im += clump
+        im_ref += fftconvolve(clump, psf, mode='same')
+    im_ref[im_ref<0] = 0
+
+    hdul_im = fits.HDUList(fits.PrimaryHDU(im))
+    hdr = hdul_im[0].header
+    hdr['APERNAME'], hdr['CFRAME'], hdr['OSAMP'] = (apname, 'sci', osamp)
+    hdr['XIND_REF'], hdr['YIND_REF'] = (xind_ref, yind_ref)
+    hdr['PIXELSCL'] = 0.031 / osamp
+
+    for crop_zeros in [True, False]:
+        im_conv = image_manip.convolve_image(hdul_im, hdul_psfs, crop_zeros=crop_zeros)
+        assert np.allclose(im_conv, im_ref, atol=1e-10)
+
+    hdul_im[0].data = im.astype('float32')
+    im_conv = image_manip.convolve_image(hdul_im, hdul_psfs)
+    assert im_conv.dtype == np.float32
+    assert np.allclose(im_conv, im_ref, atol=1e-5)
@@ -0,0 +1,19 @@
+import numpy as np
+from numpy.polynomial import legendre
+
+from webbpsf_ext import maths
+
+def test_jl_poly_legendre():
+    """Test that Legendre evaluation in `jl_poly` matches `legendre.legval`"""
+
+    rng = np.random.default_rng(1234)
+    xvals = np.linspace(0.5, 5.2, 50)
+    lxmap = [xvals.min(), xvals.max()]
+    lxvals = 2 * (xvals - np.mean(lxmap)) / (lxmap[1] - lxmap[0])
+
+    for ndeg in [0, 1, 2, 5, 9]:
+        coeff = rng.normal(size=(ndeg+1, 4, 3))
+        yfit = maths.jl_poly(xvals, coeff, use_legendre=True, lxmap=lxmap)
+        yleg = legendre.legval(lxvals, coeff).transpose(2,0,1)
+        assert yfit.shape == (xvals.size, 4, 3)
+        assert np.allclose(yfit, yleg)
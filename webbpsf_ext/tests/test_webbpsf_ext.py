@@ -140,3 +140,40 @@ def test_coron_psfs(xidl, yidl, nrc_coron_coeffs_cached):
     print("Min/Max:", np.min(diff), np.max(diff))
 
     assert np.allclose(arr1, arr2, atol=0.001)
+
+def test_coeff_worker_shared_memory():
+    """Test that PSF coefficient workers write images into shared memory"""
+
+    from multiprocessing import shared_memory
+    from astropy.io import fits
+    from webbpsf_ext import webbpsf_ext_core as core
+
+    class _Inst(object):
+        """Minimal instrument returning a constant image of the wavelength (um)"""
+        include_distortions = False
+        oversample = 2
+        def calc_psf(self, monochromatic=None, crop_psf=True):
+            return fits.HDUList(fits.PrimaryHDU(np.full([8,8], monochromatic*1e6)))
+
+    waves = [1.5, 2.5, 3.5]
+    shape = (len(waves), 8, 8)
+    nbytes = int(np.prod(shape)) * np.dtype('float').itemsize
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    try:
+        core._init_coeff_worker(_Inst(), shm.name, shape)
+        for i, w in enumerate(waves):
+            hdu = core._wrap_coeff_for_mp((None, w, i))
+            assert hdu.data is None
+            assert hdu.header['OSAMP'] == 2
+        cube = np.ndarray(shape, dtype='float', buffer=shm.buf)
+        assert np.array_equal(cube, np.full(shape, np.array(waves)[:,None,None]))
+        del cube
+
+        # Images that do not match the shared cube are returned directly
+        core._init_coeff_worker(_Inst(), shm.name, (len(waves), 4, 4))
+        hdu = core._wrap_coeff_for_mp((None, waves[0], 0))
+        assert np.array_equal(hdu.data, np.full([8,8], waves[0]))
+    finally:
+        core._init_coeff_worker(None)
+        shm.close()
+        shm.unlink()
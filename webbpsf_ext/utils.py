@@ -6,6 +6,7 @@ import matplotlib.pyplot as plt
 
 import os, sys
 import six
+import functools
 
 import webbpsf, poppy, pysiaf
 
@@ -13,7 +14,6 @@ try:
     from webbpsf.webbpsf_core import get_siaf_with_caching
 except ImportError:
     # In case user doesn't have the latest version of webbpsf installed
-    import functools
     @functools.lru_cache
     def get_siaf_with_caching(instrname):
         """ Parsing and loading the SIAF information is particularly time consuming,
@@ -78,6 +78,16 @@ def check_fitsgz(opd_file, inst_str=None):
         opd_dir = get_webbpsf_data_path()
     else:
         opd_dir = os.path.join(get_webbpsf_data_path(),inst_str,'OPD')
+
+    return _resolve_fitsgz(opd_dir, opd_file)
+
+@functools.lru_cache(maxsize=None)
+def _resolve_fitsgz(opd_dir, opd_file):
+    """Return whichever of `opd_file` or its .gz counterpart exists in `opd_dir`
+
+    Results are cached to avoid repeated filesystem checks for the same file.
+    Missing files raise an OSError, which is not cached.
+    """
     opd_fullpath = os.path.join(opd_dir, opd_file)
 
     # Check if file exists 
@@ -4,10 +4,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 import time
-import os, six
+import os, six, functools, math
 from pathlib import Path
 
 import multiprocessing as mp
+from multiprocessing import shared_memory
 import traceback
 
 from astropy.io import fits
@@ -51,6 +52,98 @@ from webbpsf.opds import OTE_Linear_Model_WSS
 # Program bar
 from tqdm.auto import trange, tqdm
 
+# Reading and combining throughput curves is relatively slow, so cache
+# bandpasses for a given set of inputs. Cached objects are shared, so
+# callers receive a copy (e.g., `convert` and `name` modify in place).
+@functools.lru_cache(maxsize=32)
+def _nircam_filter_cached(filter, **kwargs):
+    return nircam_filter(filter, **kwargs)
+
+@functools.lru_cache(maxsize=32)
+def _miri_filter_cached(filter):
+    return miri_filter(filter)
+
+@functools.lru_cache(maxsize=16)
+def _nrc_mask_image(image_mask, module, nd_squares, bar_offset, shift_x, shift_y, 
+                    npix, pixelscale, wavelength):
+    """Cached NIRCam coronagraphic mask intensity transmission image
+
+    Output array is read-only; `wavelength` is in meters.
+    """
+    from webbpsf.optics import NIRCam_BandLimitedCoron
+
+    mask = NIRCam_BandLimitedCoron(name=image_mask, module=module, nd_squares=nd_squares,
+                                   bar_offset=bar_offset, auto_offset=None, 
+                                   shift_x=shift_x, shift_y=shift_y)
+
+    # Create wavefront to pass through mask and obtain transmission image
+    wave = poppy.Wavefront(wavelength=wavelength*u.m, npix=npix, pixelscale=pixelscale)
+    im = mask.get_transmission(wave)**2
+    im.setflags(write=False)
+    return im
+
+def _square_pad(size, rot):
+    """Full extent of a square with half-width `size` rotated by `rot` degrees"""
+    ang_rad = math.radians(rot)
+    return 2 * size * (abs(math.cos(ang_rad)) + abs(math.sin(ang_rad)))
+
+@functools.lru_cache(maxsize=16)
+def _miri_mask_image(image_mask, rot1, rot2, shift_x, shift_y, npix, pixelscale):
+    """Cached MIRI focal plane mask image
+
+    Phase offsets for 4QPMs and transmission for Lyot and LRS slit masks.
+    Output array is read-only.
+    """
+
+    def make_fqpm_wrapper(name, wavelength):
+        opticslist = [poppy.IdealFQPM(wavelength=wavelength, name=image_mask, rotation=rot1, **offsets),
+                      poppy.SquareFieldStop(size=24, rotation=rot2, **offsets)]
+        container = poppy.CompoundAnalyticOptic(name=name, opticslist=opticslist)
+        return container
+
+    offsets = {'shift_x': shift_x, 'shift_y': shift_y}
+
+    if image_mask == 'FQPM1065':
+        full_pad = _square_pad(12, rot2)
+        npix = int(full_pad / pixelscale + 0.5) if npix is None else npix
+        wave = poppy.Wavefront(wavelength=10.65e-6, npix=npix, pixelscale=pixelscale)
+        mask = make_fqpm_wrapper("MIRI FQPM 1065", 10.65e-6)
+        im = np.real(mask.get_phasor(wave))
+        im /= im.max()
+    elif image_mask == 'FQPM1140':
+        full_pad = _square_pad(12, rot2)
+        npix = int(full_pad / pixelscale + 0.5) if npix is None else npix
+        wave = poppy.Wavefront(wavelength=11.4e-6, npix=npix, pixelscale=pixelscale)
+        mask = make_fqpm_wrapper("MIRI FQPM 1140", 11.40e-6)
+        im = np.real(mask.get_phasor(wave))
+        im /= im.max()
+    elif image_mask == 'FQPM1550':
+        full_pad = _square_pad(12, rot2)
+        npix = int(full_pad / pixelscale + 0.5) if npix is None else npix
+        wave = poppy.Wavefront(wavelength=15.5e-6, npix=npix, pixelscale=pixelscale)
+        mask = make_fqpm_wrapper("MIRI FQPM 1550", 15.50e-6)
+        im = np.real(mask.get_phasor(wave))
+        im /= im.max()
+    elif image_mask == 'LYOT2300':
+        full_pad = _square_pad(15, rot2)
+        npix = int(full_pad / pixelscale + 0.5) if npix is None else npix
+        wave = poppy.Wavefront(wavelength=23e-6, npix=npix, pixelscale=pixelscale)
+        opticslist = [poppy.CircularOcculter(radius=4.25 / 2, name=image_mask, rotation=rot1, **offsets),
+                      poppy.BarOcculter(width=0.722, height=31, rotation=rot1, **offsets),
+                      poppy.SquareFieldStop(size=30, rotation=rot2, **offsets)]
+        mask = poppy.CompoundAnalyticOptic(name="MIRI Lyot Occulter", opticslist=opticslist)
+        im = mask.get_transmission(wave)**2
+    elif image_mask == 'LRS slit':
+        full_pad = _square_pad(2.5, rot2)
+        npix = int(full_pad / pixelscale + 0.5) if npix is None else npix
+        wave = poppy.Wavefront(wavelength=23e-6, npix=npix, pixelscale=pixelscale)
+        mask = poppy.RectangularFieldStop(width=4.7, height=0.51, rotation=rot2, 
+                                          name=image_mask, **offsets)
+        im = mask.get_transmission(wave)**2
+
+    im.setflags(write=False)
+    return im
+
 # NIRCam Subclass
 class NIRCam_ext(webbpsf_NIRCam):
 
@@ -122,12 +215,6 @@ class NIRCam_ext(webbpsf_NIRCam):
         self.SHORT_WAVELENGTH_MIN = self.LONG_WAVELENGTH_MIN = 1e-7
         self.SHORT_WAVELENGTH_MAX = self.LONG_WAVELENGTH_MAX = 10e-6
 
-        # Detector name to SCA ID
-        self._det2sca = {
-            'A1':481, 'A2':482, 'A3':483, 'A4':484, 'A5':485,
-            'B1':486, 'B2':487, 'B3':488, 'B4':489, 'B5':490,
-        }
-
         # Option to use 1st or 2nd order for grism bandpasses
         self._grism_order = 1
 
@@ -243,7 +330,7 @@ class NIRCam_ext(webbpsf_NIRCam):
         same data twice.
         """
         if self._use_fov_pix_plus1 is None:
-            if np.mod(self.oversample, 2)==0 and np.mod(self.fov_pix, 2)==0:
+            if (self.oversample % 2)==0 and (self.fov_pix % 2)==0:
                 use_fov_pix_plus1 = True 
             else: 
                 use_fov_pix_plus1 = False
@@ -258,8 +345,9 @@ class NIRCam_ext(webbpsf_NIRCam):
     def wave_fit(self):
         """Wavelength range to fit"""
         if self.quick:
-            w1 = self.bandpass.wave.min() / 1e4
-            w2 = self.bandpass.wave.max() / 1e4
+            wave = self.bandpass.wave
+            w1 = wave.min() / 1e4
+            w2 = wave.max() / 1e4
         else:
             w1, w2 = (2.4,5.2) if self.channel=='long' else (0.5,2.5)
         return w1, w2
@@ -348,17 +436,19 @@ class NIRCam_ext(webbpsf_NIRCam):
     @property
     def scaid(self):
         """SCA ID (481, 482, ... 489, 490)"""
-        detid = self.detector[-2:]
-        return self._det2sca.get(detid, 'unknown')
+        # A1-A5 map to 481-485 and B1-B5 map to 486-490
+        mod, num = self.detector[-2:]
+        if (mod in 'AB') and (num in '12345'):
+            return 481 + 5*'AB'.index(mod) + int(num) - 1
+        else:
+            return 'unknown'
     @scaid.setter
     def scaid(self, value):
-        scaid_values = np.array(list(self._det2sca.values()))
-        det_values = np.array(list(self._det2sca.keys()))
-        if value in scaid_values:
-            ind = np.where(scaid_values==value)[0][0]
-            self.detector = 'NRC'+det_values[ind]
+        if value in range(481, 491):
+            ind = int(value) - 481
+            self.detector = 'NRC' + 'AB'[ind // 5] + str(ind % 5 + 1)
         else:
-            _check_list(value, scaid_values, var_name='scaid')
+            _check_list(value, list(range(481, 491)), var_name='scaid')
 
 
     @webbpsf_NIRCam.detector_position.setter
@@ -376,7 +466,7 @@ class NIRCam_ext(webbpsf_NIRCam):
         super(NIRCam_ext, self)._get_fits_header(result, options)
 
         # Keep detector X and Y positions as floats
-        dpos = np.asarray(self.detector_position, dtype=float)
+        dpos = (float(self.detector_position[0]), float(self.detector_position[1]))
         result[0].header['DET_X'] = (dpos[0], "Detector X pixel position of array center")
         result[0].header['DET_Y'] = (dpos[1], "Detector Y pixel position of array center")
 
@@ -386,7 +476,7 @@ class NIRCam_ext(webbpsf_NIRCam):
         # https://jwst-pipeline.readthedocs.io/en/latest/jwst/references_general/references_general.html#orientation-of-detector-image
         # 481, 3, 5, 7, 9 have fastaxis equal -1
         # Others have fastaxis equal +1
-        fastaxis = -1 if np.mod(self.scaid,2)==1 else +1
+        fastaxis = -1 if (self.scaid & 1) else +1
         return fastaxis
     @property
     def slowaxis(self):
@@ -394,7 +484,7 @@ class NIRCam_ext(webbpsf_NIRCam):
         # https://jwst-pipeline.readthedocs.io/en/latest/jwst/references_general/references_general.html#orientation-of-detector-image
         # 481, 3, 5, 7, 9 have slowaxis equal +2
         # Others have slowaxis equal -2
-        slowaxis = +2 if np.mod(self.scaid,2)==1 else -2
+        slowaxis = +2 if (self.scaid & 1) else -2
         return slowaxis
 
     @property
@@ -428,7 +518,7 @@ class NIRCam_ext(webbpsf_NIRCam):
         kwargs['module'] = self.module
         kwargs['sca'] = self.detector
 
-        bp = nircam_filter(self.filter, **kwargs)
+        bp = deepcopy(_nircam_filter_cached(self.filter, **kwargs))
         
         return bp
     
@@ -575,8 +665,6 @@ class NIRCam_ext(webbpsf_NIRCam):
             Size of output pixels in units of arcsec. If not specified,
             then selects oversample pixel scale.
         """
-        
-        from webbpsf.optics import NIRCam_BandLimitedCoron
 
         shifts = {'shift_x': self.options.get('coron_shift_x', None),
                   'shift_y': self.options.get('coron_shift_y', None)}
@@ -593,13 +681,12 @@ class NIRCam_ext(webbpsf_NIRCam):
                 bar_offset = self.get_bar_offset() if bar_offset is None else bar_offset
             else:
                 bar_offset = None
-            mask = NIRCam_BandLimitedCoron(name=self.image_mask, module=self.module, nd_squares=nd_squares,
-                                           bar_offset=bar_offset, auto_offset=None, **shifts)
 
-            # Create wavefront to pass through mask and obtain transmission image
-            wavelength = self.bandpass.avgwave().to('m')
-            wave = poppy.Wavefront(wavelength=wavelength, npix=npix, pixelscale=pixelscale)
-            im = mask.get_transmission(wave)**2
+            # Transmission images are cached for a given set of mask inputs
+            wavelength = self.bandpass.avgwave().to_value('m')
+            im = _nrc_mask_image(self.image_mask, self.module, nd_squares, bar_offset, 
+                                 shifts['shift_x'], shifts['shift_y'], 
+                                 npix, pixelscale, wavelength).copy()
         else:
             im = np.ones([npix,npix])
 
@@ -1219,7 +1306,7 @@ class MIRI_ext(webbpsf_MIRI):
         same data twice.
         """
         if self._use_fov_pix_plus1 is None:
-            use_fov_pix_plus1 = True if np.mod(self.oversample, 2)==0 else False
+            use_fov_pix_plus1 = True if (self.oversample % 2)==0 else False
         else:
             use_fov_pix_plus1 = self._use_fov_pix_plus1
         return use_fov_pix_plus1
@@ -1231,8 +1318,9 @@ class MIRI_ext(webbpsf_MIRI):
     def wave_fit(self):
         """Wavelength range to fit"""
         if self.quick:
-            w1 = self.bandpass.wave.min() / 1e4
-            w2 = self.bandpass.wave.max() / 1e4
+            wave = self.bandpass.wave
+            w1 = wave.min() / 1e4
+            w2 = wave.max() / 1e4
         else:
             w1, w2 = (5,30)
         return (w1, w2)
@@ -1314,7 +1402,7 @@ class MIRI_ext(webbpsf_MIRI):
         super(MIRI_ext, self)._get_fits_header(result, options)
 
         # Keep detector X and Y positions as floats
-        dpos = np.asarray(self.detector_position, dtype=float)
+        dpos = (float(self.detector_position[0]), float(self.detector_position[1]))
         result[0].header['DET_X'] = (dpos[0], "Detector X pixel position of array center")
         result[0].header['DET_Y'] = (dpos[1], "Detector Y pixel position of array center")
     
@@ -1333,7 +1421,7 @@ class MIRI_ext(webbpsf_MIRI):
 
     @property
     def bandpass(self):
-        return miri_filter(self.filter)
+        return deepcopy(_miri_filter_cached(self.filter))
 
     def plot_bandpass(self, ax=None, color=None, title=None, 
                       return_ax=False, **kwargs):
@@ -1378,57 +1466,18 @@ class MIRI_ext(webbpsf_MIRI):
             If set to False, then output mask is rotated along V2/V3 axes.
         """
         
-        def make_fqpm_wrapper(name, wavelength):
-            opticslist = [poppy.IdealFQPM(wavelength=wavelength, name=self.image_mask, rotation=rot1, **offsets),
-                          poppy.SquareFieldStop(size=24, rotation=rot2, **offsets)]
-            container = poppy.CompoundAnalyticOptic(name=name, opticslist=opticslist)
-            return container
-        
         rot1 = -1*self._rotation if detector_orientation else 0
         rot2 = 0 if detector_orientation else self._rotation
-        offsets = {'shift_x': self.options.get('coron_shift_x', None),
-                   'shift_y': self.options.get('coron_shift_y', None)}
+        shift_x = self.options.get('coron_shift_x', None)
+        shift_y = self.options.get('coron_shift_y', None)
         
         if pixelscale is None:
             pixelscale = self.pixelscale / self.oversample
 
-        if self.image_mask == 'FQPM1065':
-            full_pad = 2*np.max(np.abs(xy_rot(12, 12, rot2)))
-            npix = int(full_pad / pixelscale + 0.5) if npix is None else npix
-            wave = poppy.Wavefront(wavelength=10.65e-6, npix=npix, pixelscale=pixelscale)
-            mask = make_fqpm_wrapper("MIRI FQPM 1065", 10.65e-6)
-            im = np.real(mask.get_phasor(wave))
-            im /= im.max()
-        elif self.image_mask == 'FQPM1140':
-            full_pad = 2*np.max(np.abs(xy_rot(12, 12, rot2)))
-            npix = int(full_pad / pixelscale + 0.5) if npix is None else npix
-            wave = poppy.Wavefront(wavelength=11.4e-6, npix=npix, pixelscale=pixelscale)
-            mask = make_fqpm_wrapper("MIRI FQPM 1140", 11.40e-6)
-            im = np.real(mask.get_phasor(wave))
-            im /= im.max()
-        elif self.image_mask == 'FQPM1550':
-            full_pad = 2*np.max(np.abs(xy_rot(12, 12, rot2)))
-            npix = int(full_pad / pixelscale + 0.5) if npix is None else npix
-            wave = poppy.Wavefront(wavelength=15.5e-6, npix=npix, pixelscale=pixelscale)
-            mask = make_fqpm_wrapper("MIRI FQPM 1550", 15.50e-6)
-            im = np.real(mask.get_phasor(wave))
-            im /= im.max()
-        elif self.image_mask == 'LYOT2300':
-            full_pad = 2*np.max(np.abs(xy_rot(15, 15, rot2)))
-            npix = int(full_pad / pixelscale + 0.5) if npix is None else npix
-            wave = poppy.Wavefront(wavelength=23e-6, npix=npix, pixelscale=pixelscale)
-            opticslist = [poppy.CircularOcculter(radius=4.25 / 2, name=self.image_mask, rotation=rot1, **offsets),
-                          poppy.BarOcculter(width=0.722, height=31, rotation=rot1, **offsets),
-                          poppy.SquareFieldStop(size=30, rotation=rot2, **offsets)]
-            mask = poppy.CompoundAnalyticOptic(name="MIRI Lyot Occulter", opticslist=opticslist)
-            im = mask.get_transmission(wave)**2
-        elif self.image_mask == 'LRS slit':
-            full_pad = 2*np.max(np.abs(xy_rot(2.5, 2.5, rot2)))
-            npix = int(full_pad / pixelscale + 0.5) if npix is None else npix
-            wave = poppy.Wavefront(wavelength=23e-6, npix=npix, pixelscale=pixelscale)
-            mask = poppy.RectangularFieldStop(width=4.7, height=0.51, rotation=rot2, 
-                                              name=self.image_mask, **offsets)
-            im = mask.get_transmission(wave)**2
+        if self.image_mask in ['FQPM1065', 'FQPM1140', 'FQPM1550', 'LYOT2300', 'LRS slit']:
+            # Mask images are cached for a given set of mask inputs
+            im = _miri_mask_image(self.image_mask, rot1, rot2, shift_x, shift_y, 
+                                  npix, pixelscale).copy()
         else:
             im = np.ones([npix,npix])
         
@@ -2150,7 +2199,8 @@ def _gen_save_name(self, wfe_drift=0):
     moff_str2 = '' if coron_shift_y==0 else f'_my{coron_shift_y:.3f}'
     moff_str = moff_str1 + moff_str2
     
-    opd_dict = self.get_opd_info()
+    # Only need the OPD label, so skip building an OTE Linear Model
+    opd_dict = self.get_opd_info(HDUL_to_OTELM=False)
     opd_str = opd_dict['opd_str']
 
     if wfe_drift!=0:
@@ -2829,7 +2879,11 @@ def _calc_psf_webbpsf(self, calc_psf_func, add_distortion=None, fov_pixels=None,
 
 
 def _inst_copy(self):
-    """ Return a copy of the current instrument class. """
+    """ Return a copy of the current instrument class. 
+    
+    Large attributes such as the OPDs are shared with `self` rather
+    than deep copied; the copy should not modify them in place.
+    """
 
     # Change log levels to WARNING for webbpsf_ext, WebbPSF, and POPPY
     log_prev = conf.logging_level
@@ -2852,14 +2906,16 @@ def _inst_copy(self):
         inst = MIRI_ext(**init_params)
 
     # Get OPD info
-    inst.pupilopd = deepcopy(self.pupilopd)
-    inst.pupil    = deepcopy(self.pupil)
+    # The copy is only handed to worker processes, which each receive their
+    # own version (pickled or forked), so references are sufficient here.
+    inst.pupilopd = self.pupilopd
+    inst.pupil    = self.pupil
 
     # Detector and aperture info
     inst._detector = self._detector
     inst._detector_position = self._detector_position
     inst._aperturename = self._aperturename
-    inst._detector_geom_info = deepcopy(self._detector_geom_info)
+    inst._detector_geom_info = self._detector_geom_info
 
 
     # Other options
@@ -2891,12 +2947,43 @@ def _inst_copy(self):
     return inst
 
 
+# Instrument object and shared output cube stored in each multiprocessing worker
+_worker_inst = None
+_worker_out = None
+
+def _init_coeff_worker(inst, shm_name=None, shape=None):
+    """Store instrument in worker process so it is only transferred once
+
+    If `shm_name` is specified, images are written to the shared memory 
+    block holding the output image cube of size `shape` (npsf,ny,nx).
+    """
+    global _worker_inst, _worker_out
+    _worker_inst = inst
+    _worker_out = None if shm_name is None else (shm_name, tuple(shape))
+
+def _attach_shared_memory(name):
+    """Attach to a shared memory block created by the parent process
+
+    Only the parent unlinks the block, so it is not registered with the 
+    `resource_tracker` where supported (Python 3.13+). Otherwise, pool 
+    workers share the parent's tracker and registering the same name again
+    has no effect, whereas unregistering it here would break the parent's
+    `unlink` call.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
 def _wrap_coeff_for_mp(args):
     """
     Internal helper routine for parallelizing computations across multiple processors
     for multiple WebbPSF monochromatic calculations.
 
-    args => (inst,w,fov_pix,oversample)
+    args => (inst,w) or (inst,w,index)
+    If inst is None, then uses the instrument stored by `_init_coeff_worker`.
+    If index is specified and the worker has a shared output cube, then the 
+    image is written into that cube at `index` and the returned HDU has no data.
     """
     # Change log levels to WARNING for webbpsf_ext, WebbPSF, and POPPY
     log_prev = conf.logging_level
@@ -2906,7 +2993,10 @@ def _wrap_coeff_for_mp(args):
     mp_prev = poppy.conf.use_multiprocessing
     poppy.conf.use_multiprocessing = False
 
-    inst, w = args
+    inst, w = args[:2]
+    index = args[2] if len(args)>2 else None
+    if inst is None:
+        inst = _worker_inst
 
     try:
         hdu_list = inst.calc_psf(monochromatic=w*1e-6, crop_psf=True)
@@ -2933,6 +3023,16 @@ def _wrap_coeff_for_mp(args):
 
     # Specify image oversampling relative to detector sampling
     hdu.header['OSAMP'] = (inst.oversample, 'Image oversample vs det')
+
+    # Write into shared output cube rather than sending data back to parent
+    if (index is not None) and (_worker_out is not None):
+        shm_name, shape = _worker_out
+        if hdu.data.shape == shape[1:]:
+            shm = _attach_shared_memory(shm_name)
+            np.ndarray(shape, dtype='float', buffer=shm.buf)[index] = hdu.data
+            shm.close()
+            hdu.data = None
+
     return hdu
 
 def _gen_psf_coeff(self, nproc=None, wfe_drift=0, force=False, save=True, 
@@ -3008,7 +3108,8 @@ def _gen_psf_coeff(self, nproc=None, wfe_drift=0, force=False, save=True,
                 data = data[:, osamp_half:-osamp_half, osamp_half:-osamp_half]
                 hdr['FOVPIX'] = (self.fov_pix, 'WebbPSF pixel FoV')
 
-            self.psf_coeff = data
+            # Contiguous copy (after cropping) in requested precision
+            self.psf_coeff = np.ascontiguousarray(data, dtype=conf.coeff_dtype)
             self.psf_coeff_header = hdr
             return
     
@@ -3060,19 +3161,39 @@ def _gen_psf_coeff(self, nproc=None, wfe_drift=0, force=False, save=True,
     inst_copy.fov_pix = fov_pix
 
     t0 = time.time()
+    # Limit progress bar refreshes to roughly every 5% of the PSFs
+    pbar_kw = {'mininterval': 0.5, 'miniters': max(1, npsf//20)}
+
     # Setup the multiprocessing pool and arguments to pass to each pool
-    worker_arguments = [(inst_copy, wlen) for wlen in waves]
+    # Instrument copy is sent to each worker once when the pool starts,
+    # rather than pickled along with every wavelength.
+    # Workers write images directly into a shared memory cube, so only
+    # headers are sent back through the pool.
     if nproc > 1:
+        worker_arguments = [(None, wlen, i) for i, wlen in enumerate(waves)]
+        npix = fov_pix * oversample
+        shape = (npsf, npix, npix)
+        nbytes = int(np.prod(shape)) * np.dtype('float').itemsize
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        initargs = (inst_copy, shm.name, shape)
 
         hdu_arr = []
+        cube = None
         try:
-            with mp.Pool(nproc) as pool:
+            with mp.Pool(nproc, initializer=_init_coeff_worker, initargs=initargs) as pool:
                 for res in tqdm(pool.imap(_wrap_coeff_for_mp, worker_arguments), 
-                                total=npsf, desc='Monochromatic PSFs', leave=False):
+                                total=npsf, desc='Monochromatic PSFs', leave=False,
+                                **pbar_kw):
                     hdu_arr.append(res)
                 pool.close()
-            if hdu_arr[0] is None:
+            if any(hdu is None for hdu in hdu_arr):
                 raise RuntimeError('Returned None values. Issue with multiprocess or WebbPSF??')
+
+            # Copy images out of shared memory
+            cube = np.ndarray(shape, dtype='float', buffer=shm.buf)
+            for i, hdu in enumerate(hdu_arr):
+                if hdu.data is None:
+                    hdu.data = cube[i].copy()
         except Exception as e:
             setup_logging(log_prev, verbose=False)
             _log.error('Caught an exception during multiprocess.')
@@ -3080,10 +3201,16 @@ def _gen_psf_coeff(self, nproc=None, wfe_drift=0, force=False, save=True,
             raise e
         else:
             _log.info('Closing multiprocess pool.')
+        finally:
+            # Release the view into shared memory before closing it
+            cube = None
+            shm.close()
+            shm.unlink()
     else:
         # Pass arguments to the helper function
+        worker_arguments = [(inst_copy, wlen) for wlen in waves]
         hdu_arr = []
-        for wa in tqdm(worker_arguments, desc='Monochromatic PSFs', leave=False):
+        for wa in tqdm(worker_arguments, desc='Monochromatic PSFs', leave=False, **pbar_kw):
             hdu = _wrap_coeff_for_mp(wa)
             if hdu is None:
                 raise RuntimeError('Returned None values. Issue with WebbPSF??')
@@ -3237,7 +3364,7 @@ def _gen_psf_coeff(self, nproc=None, wfe_drift=0, force=False, save=True,
             coeff_all = coeff_all[:, osamp_half:-osamp_half, osamp_half:-osamp_half]
             hdr['FOVPIX'] = (self.fov_pix, 'WebbPSF pixel FoV')
             
-        self.psf_coeff = coeff_all
+        self.psf_coeff = np.ascontiguousarray(coeff_all, dtype=conf.coeff_dtype)
         self.psf_coeff_header = hdr
 
     # Create an extras dictionary for debugging purposes
@@ -3866,6 +3993,12 @@ def _gen_wfemask_coeff(self, force=False, save=True, large_grid=None,
     fov_pix_over = fov_pix * self.oversample
     try:
         cf_all = np.zeros([npos, self.ndeg+1, fov_pix_over, fov_pix_over], dtype='float')
+
+        # Detector positions for all mask offsets
+        field_rot = 0 if self._rotation is None else self._rotation
+        xyoff_pix = np.array(xy_rot(-1*xoff, -1*yoff, -1*field_rot)) / self.pixelscale
+        det_pos_all = np.array(detector_position_orig)[:,None] + xyoff_pix
+
         # Create progress bar object
         pbar = trange(npos, leave=False, desc="Mask Offsets")
         for i in pbar:
@@ -3875,11 +4008,7 @@ def _gen_wfemask_coeff(self, force=False, save=True, large_grid=None,
 
             self.options['coron_shift_x'] = xv
             self.options['coron_shift_y'] = yv
-
-            # Pixel offset information
-            field_rot = 0 if self._rotation is None else self._rotation
-            xyoff_pix = np.array(xy_rot(-1*xv, -1*yv, -1*field_rot)) / self.pixelscale
-            self.detector_position = np.array(detector_position_orig) + xyoff_pix
+            self.detector_position = det_pos_all[:,i]
 
             # Skip SGD locations until later
             if ind_sgd[i]==False:
@@ -4331,9 +4460,12 @@ def _calc_psf_from_coeff(self, sp=None, return_oversample=True, return_hdul=True
     # return psf_coeff, psf_coeff_mod
 
     # Add modifications to coefficients
-    psf_coeff_mod += psf_coeff
-    del psf_coeff
-    psf_coeff = psf_coeff_mod
+    # Nominal on-axis case has no modifications, so use coefficients directly
+    # rather than allocating a copy of the full coefficient cube
+    if not np.isscalar(psf_coeff_mod):
+        psf_coeff_mod += psf_coeff
+        del psf_coeff
+        psf_coeff = psf_coeff_mod
 
     # if multiple field points were present, we want to return PSF for each location
     if nfield>1: